@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+PROFILE_GRAPH = True  # Построение графика профиля
 PROFILE_LEVELS_TABLE = True  # Отображение уровней воды различных обеспеченностей на графике профиля
 PROFILE_LEVELS_TABLE_LINES = False  # Линии сносок от урезов воды к значению в таблицу уровней
 PROFILE_WATER_LEVEL_NOTE = True  # Отображение примечания о урезе воды
@@ -27,6 +28,11 @@ DOC_TABLE_SHORT = True  # Укороченный вариант таблицы 
 TEMP_DIR_NAME = 'TEMP'
 GRAPHICS_DIR_NAME = 'Графика'
 
+# Кэширование считанных из xls файла данных (повторное чтение неизменённого файла из кэша).
+# Кэш — файлы pickle в CACHE_DIR, включайте только для каталога, доступного на запись лишь вам
+USE_CACHE = False
+CACHE_DIR = '~/.cache/gidraulic'
+
 # Формула расчёта скорости движения
 # 1 — Расчёт обычной воды; 2 — Расчёт водокаменного селевого потока; 3 — Расчёт грязкаменного селевого потока
 CALC_TYPE = 1 # Выбор типа варианта расчёта
@@ -34,9 +40,19 @@ CALC_TYPE = 1 # Выбор типа варианта расчёта
 # Расчёт с переливом через бровку (True) или с заполнением всех секторов (False)
 OVERFLOW = False
 
+# Количество процессов для расчёта листов xls файла (1 — расчёт листов по очереди).
+# При расчёте в нескольких процессах скрипт запуска должен вызывать расчёт внутри блока
+# if __name__ == '__main__':, изменения настроек из скрипта в процессах расчёта не учитываются
+PROCESSES = 1
+
 # Разрешение экспортируемых графиков
 FIG_DPI = 200
 
+# Бэкенд matplotlib для построения рисунков отчёта: 'agg' — растровый без окон,
+# 'cairo' — быстрее для рисунков с большим количеством текста (требует установки pycairo),
+# None — бэкенд matplotlib по умолчанию. Выбранный бэкенд действует только на время расчёта
+GRAPHICS_BACKEND = None
+
 COLOR = {
     'text': 'black',  # Основной для текста
     'bottom_text': 'black',  # Основной текст в подвале
@@ -1,13 +1,28 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import xlrd
 import numpy as np
+import pandas as pd
 from docx.shared import Cm
 from docx import Document
 from docx.enum.text import WD_BREAK
 from pathlib import Path
 
+try:
+    from numba import njit
+    NUMBA_ENABLED = True
+except ImportError:
+    NUMBA_ENABLED = False
+
+    def njit(*args, **kwargs):
+        """
+        Заглушка декоратора numba.njit, если numba не установлена.
+        Функции выполняются как обычный python код.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 
 def insertPageBreak(Document):
     paragraphs = Document.paragraphs
@@ -51,15 +66,16 @@ def chunk_list(seq, num):
 def get_xls_sheet_quantity(file_path):
     """
     Функция считываем количество листов в xls файле
+    (тем же способом, что и чтение листов, поддерживаются .xls и .xlsx файлы)
         :param file_path: Путь к xls файлу
     """
     try:
-        data_file = xlrd.open_workbook(file_path)  # Открываем xls файл
+        data_file = pd.ExcelFile(file_path)  # Открываем xls файл
     except FileNotFoundError:
         print('Ошибка! Файл {} не найден. Программа будет завершена.'.format(file_path))
         sys.exit(33)
 
-    quantity = data_file.nsheets
+    quantity = len(data_file.sheet_names)
     return quantity
 
 
@@ -2,26 +2,71 @@
 import sys
 import os
 import re
+import math
+import numbers
+import hashlib
+import pickle
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
+from functools import lru_cache, partial
 
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib import gridspec
 import matplotlib.patheffects as path_effects
+from matplotlib.collections import LineCollection, PatchCollection, PathCollection, PolyCollection
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
 import numpy as np
 import pandas as pd
-import scipy.interpolate as interpolate
 from pathvalidate import sanitize_filename
 
 from docxtpl import DocxTemplate
 from docx import Document
 from docx.shared import Cm
 
-import xlrd
-
 import hydraulic.config as config
-from hydraulic.lib import poly_area, setLastParagraphStyle, chunk_list, WD_BREAK, insertPageBreak, write_table, rmdir, get_xls_sheet_quantity, insert_summary_QV_tables
+from hydraulic.lib import njit, NUMBA_ENABLED, poly_area, setLastParagraphStyle, WD_BREAK, insertPageBreak, write_table, rmdir, get_xls_sheet_quantity, insert_summary_QV_tables
+
+
+# Структура массива параметров участков: номер, первая и последняя точки,
+# коэффициент шероховатости n и уклон i
+SECTOR_DTYPE = np.dtype([('id', 'i4'), ('start', 'i4'), ('end', 'i4'), ('n', 'f8'), ('i', 'f8'),
+                         ('y_min', 'f8'), ('y_max_left', 'f8'), ('y_max_right', 'f8')])
+
+GRAVITY = 9.80665  # Ускорение свободного падения, м/с²
+SWEEP_BATCH = 512  # Количество уровней воды, рассчитываемых за один вызов скомпилированной функции
+PROGRESS_STEP = 50  # Количество расчётных уровней между выводами хода расчёта в консоль
+
+# Последовательности пробельных символов в названиях участков
+_NORM_RE = re.compile(r'\s+')
+
+# Белая обводка подписей на графиках (эффекты не хранят состояние, общие для всех подписей)
+_TEXT_STROKE = [path_effects.Stroke(linewidth=3, foreground='white', alpha=0.55), path_effects.Normal()]
+_TEXT_STROKE_THIN = [path_effects.Stroke(linewidth=1.8, foreground='white', alpha=0.55), path_effects.Normal()]
+_TEXT_STROKE_OPAQUE = [path_effects.Stroke(linewidth=3, foreground='white', alpha=0.95), path_effects.Normal()]
+
+
+def normalize_name(name):
+    """
+    Ключ названия участка для сравнения: пробелы схлопнуты, регистр нижний.
+    Строка интернируется, поэтому одинаковые ключи — один и тот же объект.
+
+        :param name: Название участка
+    """
+    return sys.intern(_NORM_RE.sub(' ', str(name)).strip().lower())
+
+
+# Атрибуты морфоствора, заполняемые при чтении xls файла (сохраняются в кэш).
+# Версия формата кэша — хэш исходного кода модуля: любое изменение чтения
+# или сохраняемых классов делает старый кэш недействительным
+XLS_CACHE_VERSION = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).hexdigest()
+XLS_CACHED_FIELDS = ('title', 'date', 'waterline', 'dH', 'coords', 'erosion_limit', 'top_limit',
+                     'top_limit_description', '_data_rows', 'x', 'y', 'situation', 'ele_min',
+                     'ele_max', 'probability', 'sectors', '_sector_array',
+                     '_n', '_i', 'max_l', 'max_r')
 
 
 @dataclass
@@ -35,6 +80,13 @@ class ProfileSector(object):
         :param roughness: Коэффициент шероховатости n
         :param slope: Уклон данного участка I, ‰
         :param coord: Список с двумя подсписками координат x и y участка
+        :param color: Цвет участка на графиках
+        :param length: Длина участка, м
+        :param x: Координаты x участка (непрерывный массив float64)
+        :param y: Координаты y участка (непрерывный массив float64)
+        :param y_min: Минимальная отметка участка
+        :param y_max_left: Максимальная отметка левой половины участка
+        :param y_max_right: Максимальная отметка правой половины участка
     """
     id: int
     name: str
@@ -43,33 +95,158 @@ class ProfileSector(object):
     roughness: float
     slope: float
     coord: tuple
+    color: list = field(init=False, default=None)
+    length: float = field(init=False, default=0.0)
+    x: np.ndarray = field(init=False, default=None, repr=False)
+    y: np.ndarray = field(init=False, default=None, repr=False)
+    y_min: float = field(init=False, default=math.nan)
+    y_max_left: float = field(init=False, default=math.nan)
+    y_max_right: float = field(init=False, default=math.nan)
+
+    # Шаблоны названий участков, компилируются один раз при импорте
+    _CHANNEL_RE = re.compile('русло', flags=re.IGNORECASE)
+    _PROTOKA_RE = re.compile('протока', flags=re.IGNORECASE)
 
     def __post_init__(self):
         self.color = self.get_color()
+        if len(self.coord):
+            self.set_coord(*self.coord)
+
+    def set_coord(self, x, y):
+        """
+        Установка координат участка и вычисление постоянных для расчёта величин
+        (длина, минимальная отметка, максимальные отметки половин участка).
+
+            :param x: Координаты x участка
+            :param y: Координаты y участка
+        """
+        self.x = np.ascontiguousarray(x, dtype=np.float64)
+        self.y = np.ascontiguousarray(y, dtype=np.float64)
+        self.coord = (self.x, self.y)
+        self.length = self.get_length()
+
+        mid = self.y.size // 2
+        self.y_min = float(self.y.min())
+        # У участка из одной точки левой половины нет
+        self.y_max_left = float(self.y[:mid].max()) if mid else math.nan
+        self.y_max_right = float(self.y[mid:].max())
 
     def get_color(self):
         name = self.name
-        channel = re.findall('русло', name, flags=re.IGNORECASE)
-        protoka = re.findall('протока', name, flags=re.IGNORECASE)
+        channel = self._CHANNEL_RE.search(name)
+        protoka = self._PROTOKA_RE.search(name)
         # floodplain = re.findall('пойма', name, flags=re.IGNORECASE)
 
+        # Цвет определяется по контрольной сумме нормализованного названия участка,
+        # поэтому одинаковые участки окрашены одинаково при каждом запуске
+        name_hash = zlib.crc32(normalize_name(name).encode('utf-8'))
+        red = ((name_hash >> 16) & 0xFF) / 255
+        green = ((name_hash >> 8) & 0xFF) / 255
+        blue = (name_hash & 0xFF) / 255
+
         if channel:
             color = [0, .5, 1]
         elif protoka:
-            color = [0, np.random.uniform(0, .5), np.random.uniform(.5, 1)]
+            color = [0, green * .5, .5 + blue * .5]
         # elif floodplain:
-            # color = [np.random.uniform(.3, 1), 0, 0]
+            # color = [.3 + red * .7, 0, 0]
         else:
-            color = [
-                np.random.uniform(0, 1),
-                np.random.uniform(0, 1),
-                np.random.uniform(0, 1)]
+            color = [red, green, blue]
         return color
 
     def get_length(self):
         return round(self.coord[0][-1] - self.coord[0][0], 3)
 
 
+@njit(cache=True)
+def _crossing_x(x1, y1, x2, y2, water_level):
+    """Координата x пересечения уреза с отрезком дна (x1, y1) — (x2, y2)."""
+    if y1 == y2:
+        return x1
+    return x1 + (water_level - y1) * (x2 - x1) / (y2 - y1)
+
+
+@njit(cache=True)
+def _water_boundary_loop(x, y, water_level, start):
+    """
+    Поиск границ уреза циклом от стартовой точки с ранним выходом (компилируется numba).
+
+        :param x: Координаты x участка (float64)
+        :param y: Координаты y участка (float64)
+        :param water_level: Уровень воды
+        :param start: Номер стартовой точки
+        :return: (x слева, номер точки слева, x справа, номер точки справа), номер -1 если граница не найдена
+    """
+    last = len(y) - 1
+    left_x, left_point = 0.0, -1
+    right_x, right_point = 0.0, -1
+
+    # Цикл влево от стартовой точки
+    for i in range(start, 0, -1):
+        if y[i - 1] >= water_level and y[i] <= water_level:
+            left_x = _crossing_x(x[i - 1], y[i - 1], x[i], y[i], water_level)
+            left_point = i - 1
+            break
+    # Пересечения нет, урез доходит до начала участка
+    if left_point < 0 and y[0] <= water_level:
+        left_x, left_point = x[0], 0
+
+    # Цикл вправо от стартовой точки
+    for i in range(start, last):
+        if y[i] <= water_level and y[i + 1] >= water_level:
+            right_x = _crossing_x(x[i], y[i], x[i + 1], y[i + 1], water_level)
+            right_point = i
+            break
+    # Пересечения нет, урез доходит до конца участка
+    if right_point < 0 and y[last] <= water_level:
+        right_x, right_point = x[last], last
+
+    return left_x, left_point, right_x, right_point
+
+
+def _water_boundary_vectorized(x, y, water_level, start):
+    """
+    Поиск границ уреза векторными операциями numpy (без numba).
+    Параметры и результат аналогичны _water_boundary_loop.
+    """
+    last = len(y) - 1
+    left_x, left_point = 0.0, -1
+    right_x, right_point = 0.0, -1
+
+    # Номера отрезков дна (i, i + 1), пересекающих урез на спуске и на подъёме
+    crossings_down = np.flatnonzero((y[:-1] >= water_level) & (y[1:] <= water_level))
+    crossings_up = np.flatnonzero((y[:-1] <= water_level) & (y[1:] >= water_level))
+
+    # Ближайшее пересечение слева от стартовой точки
+    left = crossings_down[:np.searchsorted(crossings_down, start)]
+    if start > 0 and left.size:
+        i = int(left[-1])
+        left_x, left_point = _crossing_x(x[i], y[i], x[i + 1], y[i + 1], water_level), i
+    # Пересечения нет, урез доходит до начала участка
+    elif y[0] <= water_level:
+        left_x, left_point = x[0], 0
+
+    # Ближайшее пересечение справа от стартовой точки
+    right = crossings_up[np.searchsorted(crossings_up, start):]
+    if right.size:
+        i = int(right[0])
+        right_x, right_point = _crossing_x(x[i], y[i], x[i + 1], y[i + 1], water_level), i
+    # Пересечения нет, урез доходит до конца участка
+    elif y[last] <= water_level:
+        right_x, right_point = x[last], last
+
+    return left_x, left_point, right_x, right_point
+
+
+# С numba быстрее скомпилированный цикл с ранним выходом, без неё — векторный поиск numpy
+find_water_boundary = _water_boundary_loop if NUMBA_ENABLED else _water_boundary_vectorized
+
+
+def _lazy_parameter(name):
+    """Свойство водного сечения, значение которого рассчитывается при первом обращении."""
+    return property(lambda self: self._parameters()[name])
+
+
 @dataclass
 class WaterSection(object):
     """ Класс водного сечения
@@ -88,45 +265,55 @@ class WaterSection(object):
         :param start_point: Точка начала расчёта [point_index, y]
 
     """
-    x: float
-    y: float
+    x: np.ndarray
+    y: np.ndarray
     water_level: float
-    water_section_x: list = field(default_factory=list)
-    water_section_y: list = field(default_factory=list)
-    width: float = 0.0
-    area: float = 0.0
-    average_depth: float = 0.0
-    max_depth: float = 0.0
-    wet_perimeter: float = 0.0
-    r_hydraulic: float = 0.0
     start_point: list = field(default_factory=list)
+    _params: dict = field(init=False, default=None, repr=False, compare=False)
 
     def __post_init__(self):
-        # start_point=[self.y.index(min(self.y)), min(self.y)]
+        # Параметры сечения рассчитываются при первом обращении к ним (_parameters),
+        # сечения без запроса параметров расчёта не требуют
+        self.x = np.ascontiguousarray(self.x, dtype=np.float64)
+        self.y = np.ascontiguousarray(self.y, dtype=np.float64)
+
+    def _parameters(self):
+        """Словарь рассчитанных параметров водного сечения (расчёт однократный)."""
+        if self._params is None:
+            self._params = self._calculate()
+        return self._params
+
+    water_section_x = _lazy_parameter('water_section_x')
+    water_section_y = _lazy_parameter('water_section_y')
+    width = _lazy_parameter('width')
+    area = _lazy_parameter('area')
+    average_depth = _lazy_parameter('average_depth')
+    max_depth = _lazy_parameter('max_depth')
+    wet_perimeter = _lazy_parameter('wet_perimeter')
+    r_hydraulic = _lazy_parameter('r_hydraulic')
+
+    def _calculate(self):
         boundary = self.boundary()
-        if len(boundary) > 1:
-            for water_boundary in boundary:
-                try:
-                    self._calculate_parameters(water_boundary)
-                except IndexError:
-                    print(
-                        'Ошибка в определении границ урезов! Программа будет завершена.')
-                    sys.exit(2)
-
-            # Вычисления если урезов несколько
-            self.width = sum(self.width)
-            self.area = sum(self.area)
-            self.average_depth = np.average(self.average_depth)
-            self.max_depth = max(self.max_depth)
-            self.wet_perimeter = sum(self.wet_perimeter)
-            self.r_hydraulic = sum(self.r_hydraulic)
-
-        else:
-            try:
-                self._calculate_parameters(boundary[0])
-            except IndexError:
-                print('Ошибка в определении границ урезов! Программа будет завершена.')
-                sys.exit(2)
+        try:
+            sections = [self._calculate_parameters(water_boundary) for water_boundary in boundary]
+        except IndexError:
+            print('Ошибка в определении границ урезов! Программа будет завершена.')
+            sys.exit(2)
+
+        if len(sections) == 1:
+            return sections[0]
+
+        # Вычисления если урезов несколько
+        return {
+            'water_section_x': np.concatenate([section['water_section_x'] for section in sections]),
+            'water_section_y': np.concatenate([section['water_section_y'] for section in sections]),
+            'width': sum(section['width'] for section in sections),
+            'area': sum(section['area'] for section in sections),
+            'average_depth': np.average([section['average_depth'] for section in sections]),
+            'max_depth': max(section['max_depth'] for section in sections),
+            'wet_perimeter': sum(section['wet_perimeter'] for section in sections),
+            'r_hydraulic': sum(section['r_hydraulic'] for section in sections),
+        }
 
     def boundary(self):
         x = self.x
@@ -136,156 +323,118 @@ class WaterSection(object):
         result = []
         start_point = self.start_point
 
+        # Точка с минимальной отметкой дна (одна векторная редукция)
+        min_index = int(y.argmin())
         if not start_point:
-            start_point = [y.index(min(y)), min(y)]
+            start_point = [min_index, float(y[min_index])]
 
         # Проверка на ошибку расположения уреза под поверхностью дна
-        if water_level < min(y):
+        if water_level < y[min_index]:
             print(
                 'Ошибка! Уровень воды ниже низшей точки дна. Программа будет завершена с ошибкой.')
             sys.exit(1)
         else:
-            # Цикл влево от стартовой точки
-            for i in range(start_point[0], -1, -1):
-                # Если индекс минимальной отметки совпадает с левой правой участка
-                if start_point[0] == 0 and y[start_point[0]] <= water_level:
-                    water_boundary_x.append(x[0])
-                    water_boundary_y.append(water_level)
-                    water_boundary_points.append(0)
-                    break
-
-                # Условие пересечения уреза с дном
-                if y[i - 1] >= water_level and y[i] <= water_level:
-                    x1, x2 = x[i - 1], x[i]
-                    y1, y2 = y[i - 1], y[i]
-
-                    # Нахождение координаты x уреза между точками дна
-                    f = interpolate.interp1d([y1, y2], [x1, x2])
-                    # Находим координату x, зная y (точка пересечения уреза с дном)
-                    water_boundary_x.append(float(f(water_level)))
-                    water_boundary_y.append(water_level)
-                    # Присоединяем номер точки дна с границей воды
-                    water_boundary_points.append(i - 1)
-                    break  # Прерываем поиск если нашли пересечение
-
-                # Условие отсутствия пересечения с дном и дохождения до начала участка
-                elif i - 1 == 0 and y[i - 1] <= water_level:
-                    water_boundary_x.append(x[i - 1])
-                    water_boundary_y.append(water_level)
-                    water_boundary_points.append(i - 1)
-                    break  # Прерываем поиск если нашли пересечение
-
-            # Цикл вправо от стартовой точки
-            for i in range(start_point[0], len(y) - 1):
-                # Условие пересечения уреза с дном
-                if y[i] <= water_level and y[i + 1] >= water_level:
-                    x1, x2 = x[i], x[i + 1]
-                    y1, y2 = y[i], y[i + 1]
-
-                    # Нахождение координаты x уреза между точками дна
-                    f = interpolate.interp1d([y1, y2], [x1, x2])
-                    # Находим координату x, зная y (точка пересечения уреза с дном)
-                    water_boundary_x.append(float(f(water_level)))
-                    water_boundary_y.append(water_level)
-                    # Присоединяем номер точки дна с границей воды
-                    water_boundary_points.append(i)
-                    break  # Прерываем поиск если нашли пересечение
-
-                elif i + 1 == len(y) - 1 and y[len(y) - 1] <= water_level:
-                    water_boundary_x.append(x[len(x) - 1])
-                    water_boundary_y.append(water_level)
-                    water_boundary_points.append(i + 1)
-                    break  # Прерываем поиск если нашли пересечение
-
-            # Если индекс минимальной отметки совпадает с правой границой участка
-            if start_point[0] == len(y) - 1 and y[start_point[0]] <= water_level:
-                water_boundary_x.append(x[len(y) - 1])
+            left_x, left_point, right_x, right_point = find_water_boundary(
+                x, y, float(water_level), int(start_point[0]))
+
+            # Пересечение уреза с дном слева от стартовой точки
+            if left_point >= 0:
+                water_boundary_x.append(left_x)
+                water_boundary_y.append(water_level)
+                water_boundary_points.append(left_point)
+
+            # Пересечение уреза с дном справа от стартовой точки
+            if right_point >= 0:
+                water_boundary_x.append(right_x)
                 water_boundary_y.append(water_level)
-                water_boundary_points.append(len(y) - 1)
+                water_boundary_points.append(right_point)
 
-            result.append([water_boundary_x, water_boundary_y,
-                           water_boundary_points, 0])
+            result.append([np.array(water_boundary_x), np.array(water_boundary_y),
+                           np.array(water_boundary_points), 0])
         return result
 
     # Функция выполняющая основные вычисления по данному водному сечению
     def _calculate_parameters(self, water_boundary):
-        sum_sqr = 0
         water_level = self.water_level
         x = self.x
         y = self.y
-        depth = []
-
         # Обрабатываем урезы по две точки (со второй до третьей пропускам)
         # Вводим служебные координаты (первая и последняя точки)
         x1, x2 = water_boundary[0][0], water_boundary[0][1]
         y1, y2 = water_boundary[1][0], water_boundary[1][1]
 
-        # Точки смоченного периметра (номера точек под урезом)
-        water_section_x = x[water_boundary[2][0]+1: water_boundary[2][1]+1]
-        water_section_y = y[water_boundary[2][0]+1: water_boundary[2][1]+1]
-
-        water_section_x.insert(0, x1)
-        water_section_x.insert(len(water_section_x), x2)
-
-        water_section_y.insert(0, y1)
-        water_section_y.insert(len(water_section_y), y2)
+        # Номера точек дна под урезом
+        start, end = water_boundary[2][0] + 1, water_boundary[2][1] + 1
+        n_mid = max(end - start, 0)
 
         # Если первая точка УВ выше первой точки дна, вставляем точку дна на второе место
         # TODO: Костыль для определения полигона водной поверхности для расчёта с переливом
         #  и одновременным заполнением, нужно продумать как исправить
         if config.OVERFLOW:  # исходные данные точек x и y по всему профилю
-            if water_level > y[water_boundary[2][0]]:
-                water_section_x.insert(1, x[0])
-                water_section_y.insert(1, y[0])
+            first_extra = water_level > y[water_boundary[2][0]]
         else:  # исходные данные точек x и y по участкам
-            if water_level > y[0]:
-                water_section_x.insert(1, x[0])
-                water_section_y.insert(1, y[0])
+            first_extra = water_level > y[0]
 
         # Если последняя точка УВ выше последней точки дна, вставляем точку на предпоследнее место
-        if water_boundary[3] > 1 and water_level > y[-1]:
-            water_section_x.insert(len(water_section_x)-1, x[-1])
-            water_section_y.insert(len(water_section_y)-1, y[-1])
+        last_extra = water_boundary[3] > 1 and water_level > y[-1]
+
+        # Точки смоченного периметра: урез, [первая точка дна], точки под урезом, [последняя точка дна], урез
+        size = n_mid + 2 + int(first_extra) + int(last_extra)
+        water_section_x = np.empty(size)
+        water_section_y = np.empty(size)
+
+        water_section_x[0], water_section_y[0] = x1, y1
+        water_section_x[-1], water_section_y[-1] = x2, y2
 
-        # Координаты x и y смоченного периметра
-        self.water_section_x = water_section_x
-        self.water_section_y = water_section_y
+        mid = 1
+        if first_extra:
+            water_section_x[1], water_section_y[1] = x[0], y[0]
+            mid = 2
+        water_section_x[mid:mid + n_mid] = x[start:end]
+        water_section_y[mid:mid + n_mid] = y[start:end]
+        if last_extra:
+            water_section_x[-2], water_section_y[-2] = x[-1], y[-1]
 
-        # Определяем ширину водной поверхности
-        self.width = x2-x1
+        # Ширина водной поверхности
+        width = x2 - x1
 
         # Площадь воды
-        self.area = poly_area(water_section_x, water_section_y)
+        area = poly_area(water_section_x, water_section_y)
 
         # Глубины
-        for i in range(len(water_section_y)):
-            depth.append(water_level - water_section_y[i])
+        depth = water_level - water_section_y
 
         # Средняя глубина
-        if self.area > 0 and self.width > 0:
-            self.average_depth = self.area/self.width
+        if area > 0 and width > 0:
+            average_depth = area / width
         else:
-            self.average_depth = 0
+            average_depth = 0
 
-        if self.average_depth == 0:  # Костыль
-            self.average_depth = 0.00001
+        if average_depth == 0:  # Костыль
+            average_depth = 0.00001
 
-        # Максимальная глубина
-        self.max_depth = max(depth)
-
-        # Смоченный периметр
-        for i in range(len(water_section_x) - 1):
-            sum_sqr += (water_section_x[i+1] - water_section_x[i])**2
-        self.w_perimeter = np.sqrt(sum_sqr)
+        # Смоченный периметр (длина линии дна под урезом)
+        wet_perimeter = np.hypot(np.diff(water_section_x), np.diff(water_section_y)).sum()
 
         # Гидравлический радиус
-        if self.area > 0 and self.w_perimeter > 0:
-            self.r_hydraulic = self.area/self.w_perimeter
+        if area > 0 and wet_perimeter > 0:
+            r_hydraulic = area / wet_perimeter
         else:
-            self.r_hydraulic = 0
+            r_hydraulic = 0
+
+        if r_hydraulic == 0:  # Костыль
+            r_hydraulic = 0.00001
 
-        if self.r_hydraulic == 0:  # Костыль
-            self.r_hydraulic = 0.00001
+        return {
+            'water_section_x': water_section_x,  # Координаты x и y смоченного периметра
+            'water_section_y': water_section_y,
+            'width': width,
+            'area': area,
+            'average_depth': average_depth,
+            'max_depth': float(depth.max()),  # Максимальная глубина
+            'wet_perimeter': wet_perimeter,
+            'r_hydraulic': r_hydraulic,
+        }
 
 
 @dataclass
@@ -305,7 +454,7 @@ class Calculation(object):
     a: float  # Площадь водного сечений
     v: float = 0  # Скорость
     q: float = 0  # Расход
-    __g: float = 9.80665  # Ускорение свободного падения
+    __g: float = GRAVITY  # Ускорение свободного падения
     shezi: float = 0  # Коэффициент Шези
     type__: str = 'Не определен'
 
@@ -319,73 +468,317 @@ class Calculation(object):
             self.__shezi_pavlovskij_zheleznjakov()
 
         # Тип расчёта, обычная вода или селевой поток
-        if config.CALC_TYPE == 1:
-            # Расчёт скорости воды
-            self.v = self.shezi * np.sqrt(self.h * (self.i / 1000))
-        elif config.CALC_TYPE == 2:
-            # Расчёт скорости воды для наносоводных селей
-            self.v = 4.5 * self.h**0.67 * (self.i / 1000)**0.17
-        elif config.CALC_TYPE == 3:
-            # Расчёт скорости воды для грязекаменных селей селей
-            self.v = 3.75 * self.h**0.50 * (self.i / 1000)**0.17
-        else:
+        if config.CALC_TYPE not in (1, 2, 3):
             print(
                 'Ошибка выбора формулы расчёта скорости потока. Программа будет завершена.')
             sys.exit(1)
-        # Расчёт расхода воды
+
+        # Расчёт скорости и расхода воды
+        self.v = _velocity(config.CALC_TYPE, self.shezi, float(self.h), float(self.i))
         self.q = self.a * self.v
 
     # Коэффициент Шези по формуле Н. Н. Павловского, степенной коэффициент по формуле Железнякова
     def __shezi_pavlovskij_zheleznjakov(self):
-        # Показатель сетепени по формуле Г. В. Железнякова
-        y = 1/np.log10(self.h) * np.log10(
-                (1/2 - (self.n * np.sqrt(self.__g)/0.26) * (1 - np.log10(self.h))) +
-                self.n*np.sqrt(
-                    1/4 * (
-                        1/self.n - np.sqrt(self.__g)/0.13 *
-                        (1 - np.log10(self.h))
-                    )**2 + np.sqrt(self.__g)/0.13 *
-                    (1/self.n + np.sqrt(self.__g) * np.log10(self.h))
-                )
-            )
-
-        self.shezi = (1/self.n) * self.h**y
+        self.shezi = _shezi_pavlovskij_zheleznjakov(float(self.n), float(self.h), self.__g)
         self.type__ = 'Коэффициент Шези определён по формуле Павловского, \
                        показатель степени определён по формуле Железнякова'
 
     # Коэффициент шези по формуле Маннинга
     def __shezi_mannign(self):
-        self.shezi = (1/self.n) * self.h**(1/6)
+        self.shezi = _shezi_manning(float(self.n), float(self.h))
         self.type__ = 'Коэффициент Шези определён по формуле Маннинга'
 
     # Коэффициент шези по формуле Павловского для глубин 0.1 < h < 3 (Гидрорасчёты считают по этой формуле)
     def __shezi_pavlovskij(self):
-        y = 2.5 * np.sqrt(self.n) - 0.13 - 0.75 * \
-            np.sqrt(self.h)*(np.sqrt(self.n) - 0.10)
-        self.shezi = (1/self.n) * self.h**y
+        self.shezi = _shezi_pavlovskij(float(self.n), float(self.h))
         self.type__ = 'Коэффициент шези определён по формуле Павловского для глубин 0.1 < h < 3 м'
 
     # Коэффициент шези по формуле Железнякова
     def __shezi_zheleznjakov(self):
-        self.shezi = 1/2 * \
-            (
-                (1/self.n) - (np.sqrt(self.__g)/0.13) * (1 - np.log10(self.h))) + \
-            np.sqrt(
-                (1/4) * (1/self.n - (np.sqrt(self.__g)/0.13) * (1 - np.log10(self.h)))**2 +
-                (np.sqrt(self.__g)/0.13) * ((1/self.n) +
-                                            (np.sqrt(self.__g) * np.log10(self.h)))
-            )
+        self.shezi = _shezi_zheleznjakov(float(self.n), float(self.h), self.__g)
         self.type__ = 'Коэффициент шези определён по формуле Железнякова'
 
 
+@njit(cache=True, fastmath=True)
+def _shezi_pavlovskij_zheleznjakov(n, h, g):
+    """
+    Коэффициент Шези по формуле Н. Н. Павловского,
+    показатель степени по формуле Г. В. Железнякова.
+
+        :param n: Коэффициент шероховатости
+        :param h: Средняя глубина
+        :param g: Ускорение свободного падения
+    """
+    y = 1/math.log10(h) * math.log10(
+            (1/2 - (n * math.sqrt(g)/0.26) * (1 - math.log10(h))) +
+            n*math.sqrt(
+                1/4 * (
+                    1/n - math.sqrt(g)/0.13 *
+                    (1 - math.log10(h))
+                )**2 + math.sqrt(g)/0.13 *
+                (1/n + math.sqrt(g) * math.log10(h))
+            )
+        )
+
+    return (1/n) * h**y
+
+
+@njit(cache=True, fastmath=True)
+def _shezi_manning(n, h):
+    """
+    Коэффициент Шези по формуле Маннинга.
+
+        :param n: Коэффициент шероховатости
+        :param h: Средняя глубина
+    """
+    return (1/n) * h**(1/6)
+
+
+@njit(cache=True, fastmath=True)
+def _shezi_pavlovskij(n, h):
+    """
+    Коэффициент Шези по формуле Павловского для глубин 0.1 < h < 3.
+
+        :param n: Коэффициент шероховатости
+        :param h: Средняя глубина
+    """
+    y = 2.5 * math.sqrt(n) - 0.13 - 0.75 * \
+        math.sqrt(h)*(math.sqrt(n) - 0.10)
+    return (1/n) * h**y
+
+
+@njit(cache=True, fastmath=True)
+def _shezi_zheleznjakov(n, h, g):
+    """
+    Коэффициент Шези по формуле Железнякова.
+
+        :param n: Коэффициент шероховатости
+        :param h: Средняя глубина
+        :param g: Ускорение свободного падения
+    """
+    return 1/2 * \
+        (
+            (1/n) - (math.sqrt(g)/0.13) * (1 - math.log10(h))) + \
+        math.sqrt(
+            (1/4) * (1/n - (math.sqrt(g)/0.13) * (1 - math.log10(h)))**2 +
+            (math.sqrt(g)/0.13) * ((1/n) +
+                                   (math.sqrt(g) * math.log10(h)))
+        )
+
+
+@njit(cache=True, fastmath=True)
+def _velocity(calc_type, shezi, h, i):
+    """
+    Скорость потока в зависимости от типа расчёта.
+
+        :param calc_type: 1 — вода; 2 — наносоводный сель; 3 — грязекаменный сель
+        :param shezi: Коэффициент Шези
+        :param h: Средняя глубина
+        :param i: Уклон, промилле
+    """
+    if calc_type == 1:
+        # Расчёт скорости воды
+        return shezi * math.sqrt(h * (i / 1000))
+    elif calc_type == 2:
+        # Расчёт скорости воды для наносоводных селей
+        return 4.5 * h**0.67 * (i / 1000)**0.17
+    # Расчёт скорости воды для грязекаменных селей селей
+    return 3.75 * h**0.50 * (i / 1000)**0.17
+
+
+def water_endpoints(x, y, levels):
+    """
+    Координаты x левого и правого урезов воды на профиле для набора уровней
+    (заполнение от точки с минимальной отметкой, как в WaterSection).
+
+        :param x: Координаты x профиля
+        :param y: Координаты y профиля
+        :param levels: Уровни воды
+        :return: Массивы координат x левых и правых урезов
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    start = int(np.argmin(y))
+
+    left = np.empty(len(levels))
+    right = np.empty(len(levels))
+    for k, level in enumerate(levels):
+        left_x, left_point, right_x, right_point = find_water_boundary(x, y, float(level), start)
+        if left_point < 0 or right_point < 0:
+            print('Ошибка в определении границ урезов! Программа будет завершена.')
+            sys.exit(2)
+        left[k], right[k] = left_x, right_x
+    return left, right
+
+
+@njit(cache=True)
+def _wet_section(x, y, water_level):
+    """
+    Точки смоченного периметра участка при заполнении от точки с минимальной отметкой
+    (повторяет WaterSection.water_section_x/y для расчёта с заполнением по участкам).
+
+        :param x: Координаты x участка
+        :param y: Координаты y участка
+        :param water_level: Уровень воды
+        :return: Координаты x и y смоченного периметра: урез, [первая точка дна], точки под урезом, урез
+    """
+    left_x, left_point, right_x, right_point = _water_boundary_loop(x, y, water_level, np.argmin(y))
+
+    first_extra = water_level > y[0]
+    n_mid = max(right_point - left_point, 0)
+    size = n_mid + 2 + int(first_extra)
+    section_x = np.empty(size)
+    section_y = np.empty(size)
+    section_x[0], section_y[0] = left_x, water_level
+    section_x[-1], section_y[-1] = right_x, water_level
+    mid = 1
+    if first_extra:
+        section_x[1], section_y[1] = x[0], y[0]
+        mid = 2
+    section_x[mid:mid + n_mid] = x[left_point + 1:right_point + 1]
+    section_y[mid:mid + n_mid] = y[left_point + 1:right_point + 1]
+    return section_x, section_y
+
+
+@njit(cache=True)
+def _wet_perimeter_sweep(x, y, levels):
+    """
+    Точки смоченных периметров участка для набора уровней за один вызов
+    (как _wet_section для каждого уровня, точки записываются в общие буферы).
+
+        :param x: Координаты x участка
+        :param y: Координаты y участка
+        :param levels: Уровни воды (float64)
+        :return: Координаты x и y точек всех периметров и границы периметров в буферах
+    """
+    # Периметр содержит не больше точек участка и двух урезов
+    points_x = np.empty(len(levels) * (len(x) + 2))
+    points_y = np.empty(len(levels) * (len(x) + 2))
+    offsets = np.empty(len(levels) + 1, dtype=np.int64)
+    offsets[0] = 0
+    size = 0
+    for k in range(len(levels)):
+        section_x, section_y = _wet_section(x, y, levels[k])
+        n = len(section_x)
+        points_x[size:size + n] = section_x
+        points_y[size:size + n] = section_y
+        size += n
+        offsets[k + 1] = size
+    return points_x[:size], points_y[:size], offsets
+
+
+@njit(cache=True)
+def _section_hydraulics(x, y, water_level, n, i, calc_type, g):
+    """
+    Параметры водного сечения участка и расчёт скорости и расхода за один проход
+    (повторяет WaterSection и Calculation для расчёта с заполнением по участкам).
+
+        :param x: Координаты x участка
+        :param y: Координаты y участка
+        :param water_level: Уровень воды
+        :param n: Коэффициент шероховатости
+        :param i: Уклон, промилле
+        :param calc_type: Тип расчёта скорости (config.CALC_TYPE)
+        :param g: Ускорение свободного падения
+        :return: F, B, Hср, Hмакс, V, Q, коэффициент Шези
+    """
+    section_x, section_y = _wet_section(x, y, water_level)
+    size = len(section_x)
+
+    # Площадь (формула площади Гаусса), смоченный периметр и минимальная отметка сечения
+    area_sum = 0.0
+    wet_perimeter = 0.0
+    bottom = section_y[0]
+    for k in range(size):
+        area_sum += section_x[k] * section_y[k - 1] - section_y[k] * section_x[k - 1]
+        if k > 0:
+            wet_perimeter += math.hypot(section_x[k] - section_x[k - 1], section_y[k] - section_y[k - 1])
+        bottom = min(bottom, section_y[k])
+    area = 0.5 * abs(area_sum)
+    width = section_x[-1] - section_x[0]
+
+    # Средняя глубина
+    average_depth = area / width if area > 0 and width > 0 else 0.0
+    if average_depth == 0:  # Костыль
+        average_depth = 0.00001
+
+    # Коэффициент Шези: до 3-х метров по Павловскому, свыше по Павловскому-Железнякову
+    if 0 <= average_depth <= 3:
+        shezi = _shezi_pavlovskij(n, average_depth)
+    else:
+        shezi = _shezi_pavlovskij_zheleznjakov(n, average_depth, g)
+    v = _velocity(calc_type, shezi, average_depth, i)
+
+    return area, width, average_depth, water_level - bottom, v, area * v, shezi
+
+
+@njit(cache=True)
+def _sectors_hydraulics(x, y, starts, ends, n, i, water_level, calc_type, g):
+    """
+    Гидравлические параметры всех участков профиля для одного уровня воды.
+
+        :param x: Координаты x профиля
+        :param y: Координаты y профиля
+        :param starts: Номера первых точек участков
+        :param ends: Номера последних точек участков
+        :param n: Коэффициенты шероховатости участков
+        :param i: Уклоны участков, промилле
+        :param water_level: Уровень воды
+        :param calc_type: Тип расчёта скорости (config.CALC_TYPE)
+        :param g: Ускорение свободного падения
+        :return: Массив (участок, [F, B, Hср, Hмакс, V, Q, Шези]), для сухих участков NaN
+    """
+    result = np.full((len(starts), 7), np.nan)
+    for k in range(len(starts)):
+        sector_x = x[starts[k]:ends[k] + 1]
+        sector_y = y[starts[k]:ends[k] + 1]
+        if sector_y.min() < water_level:
+            result[k] = _section_hydraulics(sector_x, sector_y, water_level, n[k], i[k], calc_type, g)
+    return result
+
+
+@njit(cache=True)
+def _sweep_levels(x, y, starts, ends, n, i, water_level, dH, target, max_levels, calc_type, g):
+    """
+    Расчёт участков для последовательных уровней воды с шагом dH до уровня,
+    на котором суммарный расход достигает target (но не более max_levels уровней).
+
+        :param water_level: Первый расчётный уровень воды
+        :param dH: Шаг по уровню воды, м
+        :param target: Расход, до которого выполняется расчёт
+        :param max_levels: Наибольшее количество уровней за один вызов
+        :return: Уровни воды, массив (уровень, участок, параметры) как у _sectors_hydraulics,
+                 суммарный расход последнего уровня
+    """
+    levels = np.empty(max_levels)
+    result = np.empty((max_levels, len(starts), 7))
+    total = 0.0
+    count = 0
+    while count < max_levels:
+        levels[count] = water_level
+        result[count] = _sectors_hydraulics(x, y, starts, ends, n, i, water_level, calc_type, g)
+
+        # Суммарный расход по участкам с водой
+        total = 0.0
+        for k in range(len(starts)):
+            if not np.isnan(result[count, k, 0]):
+                total += result[count, k, 5]
+
+        count += 1
+        water_level += dH
+        if not total < target:
+            break
+    return levels[:count], result[:count], total
+
+
 @dataclass
 class Morfostvor(object):
 
     """Класс описывающий морфствор."""
     # Основные параметры морфоствора
     title: str = ''
-    x: list = field(default_factory=list)
-    y: list = field(default_factory=list)
+    x: np.ndarray = field(default_factory=lambda: np.empty(0))
+    y: np.ndarray = field(default_factory=lambda: np.empty(0))
     situation: list = field(default_factory=list)
     sectors: list = field(default_factory=list)
     ele_max: float = 0
@@ -401,9 +794,9 @@ class Morfostvor(object):
     coords: list = field(default_factory=list)
     strings: dict = field(default_factory=dict)
 
-    levels_result: pd.DataFrame = pd.DataFrame
-    hydraulic_result: pd.DataFrame = pd.DataFrame
-    hydraulic_table: pd.DataFrame = pd.DataFrame
+    levels_result: pd.DataFrame = field(default_factory=pd.DataFrame)
+    hydraulic_result: pd.DataFrame = field(default_factory=pd.DataFrame)
+    hydraulic_table: pd.DataFrame = field(default_factory=pd.DataFrame)
 
     def __post_init__(self):
         # Выбор варианта расчёта
@@ -420,29 +813,98 @@ class Morfostvor(object):
 
         self.qh_title = f"Кривая расхода {self.strings['type']} Q = f(H)"
 
+        # Параметры участков в виде структурированного массива (заполняется при чтении xls)
+        self._sector_array = np.zeros(0, dtype=SECTOR_DTYPE)
+        self._n = np.empty(0)
+        self._i = np.empty(0)
+
+    def _cache_path(self, file_path, page):
+        """
+        Путь к файлу кэша считанных данных листа xls файла.
+        Ключ кэша — версия формата кэша, путь к файлу, время изменения, размер файла и номер листа.
+
+            :param file_path: Путь к xls файлу
+            :param page: Номер листа
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        key = (XLS_CACHE_VERSION, str(Path(file_path).resolve()), stat.st_mtime_ns, stat.st_size, page)
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return Path(config.CACHE_DIR).expanduser() / f"{digest}.pkl"
+
+    def _load_cache(self, cache_path):
+        """Загрузка считанных данных из кэша, возвращает True при успешной загрузке."""
+        if cache_path is None or not cache_path.is_file():
+            return False
+
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                state = pickle.load(cache_file)
+        except Exception:
+            # Повреждённый или устаревший кэш игнорируем, данные считываются заново
+            return False
+
+        # Кэш, сохранённый с другим набором атрибутов, не используется
+        if not isinstance(state, dict) or not all(name in state for name in XLS_CACHED_FIELDS):
+            return False
+
+        for name in XLS_CACHED_FIELDS:
+            setattr(self, name, state[name])
+
+        # Участки из кэша хранят копии координат, координаты участков снова
+        # становятся срезами массивов профиля, как при чтении xls
+        for sector, start, end in zip(self.sectors, self._sector_array['start'].tolist(),
+                                      self._sector_array['end'].tolist()):
+            sector.set_coord(self.x[start:end + 1], self.y[start:end + 1])
+        return True
+
+    def _save_cache(self, cache_path):
+        """Сохранение считанных данных в кэш."""
+        if cache_path is None:
+            return
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'wb') as cache_file:
+                pickle.dump({name: getattr(self, name) for name in XLS_CACHED_FIELDS},
+                            cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            # Ошибка записи кэша не влияет на расчёт
+            pass
+
     def read_xls(self, file_path, page=0):
         """Функция чтения из xls файла."""
         # TODO: сделать проверку типа данных для коэффициента шероховатости
 
+        # Повторное чтение неизменённого файла выполняется из кэша
+        cache_path = self._cache_path(file_path, page) if config.USE_CACHE else None
+        if self._load_cache(cache_path):
+            print(f"Считываем исходные данные из кэша: {file_path}, страница {page}.")
+            return
+
         try:
-            data_file = xlrd.open_workbook(file_path)  # Открываем xls файл
+            data_file = pd.ExcelFile(file_path)  # Открываем xls файл
         except FileNotFoundError:
             print(f"Ошибка! Файл {file_path} не найден. Программа будет завершена.")
             sys.exit(33)
 
         try:
             # Открываем лист по заданому номеру
-            sheet = data_file.sheet_by_index(page)
+            sheet_title = data_file.sheet_names[page]
         except IndexError:
             print(
                 'Неверно указан индекс листа .xls файла. Проверьте параметры запуска расчёта.')
             sys.exit(1)
 
-        sheet_title = sheet.name
         print(f"Считываем исходные данные из .xlsx файла: {file_path}, страница {page} ({sheet_title}).")
 
-        __raw_data = []  # Сырые строки xlsx файла
-        i = 0
+        # Сырые строки xlsx файла (без строки заголовков) считываем целиком,
+        # пустые ячейки заменяем пустыми строками
+        sheet = data_file.parse(page, header=None).iloc[1:].reset_index(drop=True)
+        __raw_data = sheet.astype(object).where(sheet.notna(), '')
 
         # Позиционирование столбцов с данными в .xls файле
         __x_coord_col = 0
@@ -459,62 +921,64 @@ class Morfostvor(object):
             print('    — Определяем участки ... ', end='')
             # №, Описание участка, номер первой точки, номер последней точки,
             # коэффициент шероховатости, уклон ‰, координата x, координаты y
-            lines_num = 0
-
-            # Считываем количество строк с не пустыми координатами
-            for line in __raw_data:
-                if type(line[__x_coord_col]) != str:
-                    lines_num += 1
+            lines_num = self._data_rows  # Количество строк с не пустыми координатами
 
-            sectors = self.sectors  # Список участков
             x = self.x  # Координаты профиля X
             y = self.y  # Координаты профиля Y
 
-            num = 1  # Номера участков
-
-            ###
-            # Перебираем все строки xls файла и ищем участки
-            for line in range(lines_num):
-                name = __raw_data[line][__sector_name_col]  # Описание профиля
-                # Коэффициент шероховатости
-                roughness = __raw_data[line][__roughness_col]
-                slope = __raw_data[line][__slope_col]  # Уклон
-
-                # По первой строке создаём первый сектор
-                if line == 0:
-                    coord = []
-                    sectors.append(ProfileSector(
-                        num, name, line, line, roughness, slope, coord))
-
-                # Сравниваем имя предыдущего участка с текущим, и если не совпадают то создаем новый сектор:
-                elif name != sectors[num - 1].name:
-                    if sectors[num - 1].id == 1:  # Если первый участок
-                        # Записываем номер последний точки - 1
-                        sectors[num - 1].end_point = line
-                    else:  # Если все остальные участки
-                        # Записываем номер последний точки в предыдущий участок для всех остальных участков
-                        sectors[num - 1].end_point = line
-
-                    num += 1  # Увеличиваем номер сектора на 1
-                    sectors.append(ProfileSector(
-                        num, name, sectors[num - 2].end_point, line, roughness, slope, coord))
-
-            # Номер последней точки в последнем секторе
-            sectors[-1].end_point = len(x) - 1
-
-            # Записываем координаты и длины участков
-            for sector in sectors:
-                sector.coord = (
-                    (x[sector.start_point: sector.end_point + 1],
-                     y[sector.start_point: sector.end_point + 1]))  # Координаты из начальной и конечной точек
-                # Длины полученные из разницы координат по x
-                sector.length = sector.get_length()
+            # Столбцы участков по строкам с координатами
+            names = __raw_data[__sector_name_col].to_numpy()[:lines_num]  # Описание профиля
+            roughness = __raw_data[__roughness_col].to_numpy()[:lines_num]  # Коэффициент шероховатости
+            slope = __raw_data[__slope_col].to_numpy()[:lines_num]  # Уклон
+
+            # Новый участок начинается в строке, где название отличается от предыдущего.
+            # Соседние участки имеют общую граничную точку, последний заканчивается последней точкой профиля
+            starts = np.concatenate(([0], np.flatnonzero(names[1:] != names[:-1]) + 1))
+            ends = np.append(starts[1:], len(x) - 1)
+
+            # Числовые параметры участков одним блоком для векторных расчётов
+            self._sector_array = np.zeros(len(starts), dtype=SECTOR_DTYPE)
+            self._sector_array['id'] = np.arange(1, len(starts) + 1)
+            self._sector_array['start'] = starts
+            self._sector_array['end'] = ends
+            self._sector_array['n'] = pd.to_numeric(roughness[starts], errors='coerce')
+            self._sector_array['i'] = pd.to_numeric(slope[starts], errors='coerce')
+
+            # Коэффициенты шероховатости и уклоны, которые не удалось перевести в числа
+            invalid = np.flatnonzero(np.isnan(self._sector_array['n']) | np.isnan(self._sector_array['i']))
+            if invalid.size:
+                start = int(starts[invalid[0]])
+                print(f"\n\nОшибка! Неверный коэффициент шероховатости или уклон участка '{names[start]}' "
+                      f"в строке {start + 2}: n = {roughness[start]!r}, i = {slope[start]!r}. "
+                      "Программа будет завершена.")
+                sys.exit(3)
+
+            # Коэффициенты шероховатости и уклоны участков непрерывными массивами
+            # (передаются в скомпилированный расчёт без копирования)
+            self._n = np.ascontiguousarray(self._sector_array['n'])
+            self._i = np.ascontiguousarray(self._sector_array['i'])
+
+            # Координаты участков из начальной и конечной точек (срезы массивов профиля без копирования),
+            # длины и отметки участков вычисляются один раз при создании участка
+            sectors = [
+                ProfileSector(num, names[start], int(start), int(end), roughness[start], slope[start],
+                              (x[start:end + 1], y[start:end + 1]))
+                for num, (start, end) in enumerate(zip(starts, ends), start=1)]
+
+            # Минимальные отметки участков (поиск участка с наименьшей отметкой дна)
+            # и максимальные отметки половин участков (проверка перелива)
+            self._sector_array['y_min'] = [sector.y_min for sector in sectors]
+            self._sector_array['y_max_left'] = [sector.y_max_left for sector in sectors]
+            self._sector_array['y_max_right'] = [sector.y_max_right for sector in sectors]
 
             try:
+                # Отметки последнего участка
+                sector_y = sectors[-1].y
+                mid = sector_y.size // 2
                 # Максимальная отметка участка слева
-                self.max_l = max(chunk_list(sector.coord[1], 2)[0])
+                self.max_l = float(sector_y[:mid].max())
                 # Максимальная отметка участка справа
-                self.max_r = max(chunk_list(sector.coord[1], 2)[1])
+                self.max_r = float(sector_y[mid:].max())
             except:
                 print('\n\nОшибка в определении участков. Список участков:\n')
                 for sector in sectors:
@@ -526,71 +990,98 @@ class Morfostvor(object):
             print(f"успешно, найдено {len(sectors)} участка.\n")
             return sectors
 
-        # Перебираем все строки
-        # И получаем список сырых данных
-        for rownum in range(1, sheet.nrows):
-            row = sheet.row_values(rownum)
-            __raw_data.append(row)  # Записываем данные
-
         # Устанавливаем основные параметры морфоствора
         print('    — Устанавливаем основные параметры морфоствора ... ', end='')
-        self.title = __raw_data[2][__description_col]  # Заголовок профиля
-        self.date = __raw_data[3][__description_col]  # Дата профиля
+        self.title = __raw_data.iat[2, __description_col]  # Заголовок профиля
+        self.date = __raw_data.iat[3, __description_col]  # Дата профиля
 
-        self.waterline = __raw_data[4][__description_col]  # Отметка уреза воды
+        self.waterline = __raw_data.iat[4, __description_col]  # Отметка уреза воды
         # Проверяем задан ли урез текстом, если нет округляем до 2 знаков
         if type(self.waterline) is not str:
-            self.waterline = round(self.waterline, 2)
+            self.waterline = round(float(self.waterline), 2)
 
-        self.dH = __raw_data[5][__description_col]  # Расчётный шаг по глубине
-        self.coords = __raw_data[6][__description_col]  # Координаты
-        self.erosion_limit = __raw_data[7][__description_col]  # Предел размыва
-        self.top_limit = __raw_data[8][__description_col]  # Верхняя граница
-        self.top_limit_description = __raw_data[9][__description_col] # Описание верхней границы
+        self.dH = __raw_data.iat[5, __description_col]  # Расчётный шаг по глубине
+        self.coords = __raw_data.iat[6, __description_col]  # Координаты
+        self.erosion_limit = __raw_data.iat[7, __description_col]  # Предел размыва
+        self.top_limit = __raw_data.iat[8, __description_col]  # Верхняя граница
+        self.top_limit_description = __raw_data.iat[9, __description_col] # Описание верхней границы
         print('успешно!')
 
         # Считываем и записываем все точки x и y профиля
         print('    — Считываем координаты профиля ... ', end='')
-        for i in range(len(__raw_data)):
-            if type(__raw_data[i][__x_coord_col]) != str:
-                self.x.append(__raw_data[i][__x_coord_col])
-                self.y.append(__raw_data[i][__y_coord_col])
-                self.situation.append(__raw_data[i][__situation_col])
+        # Строки с координатами — строки, в которых x задан не текстом (пустые ячейки — пустые строки)
+        mask = __raw_data[__x_coord_col].map(type) != str
+        self._data_rows = int(mask.sum())  # Количество строк с не пустыми координатами
+        x_col = pd.to_numeric(__raw_data[__x_coord_col][mask], errors='coerce')
+        y_col = pd.to_numeric(__raw_data[__y_coord_col][mask], errors='coerce')
+
+        # Координаты, которые не удалось перевести в числа
+        invalid = x_col.isna() | y_col.isna()
+        if invalid.any():
+            row = invalid.idxmax()
+            print(f"\n\nОшибка! Неверные координаты в строке {row + 2} листа {sheet_title}: "
+                  f"x = {__raw_data.iat[row, __x_coord_col]!r}, y = {__raw_data.iat[row, __y_coord_col]!r}. "
+                  "Программа будет завершена.")
+            sys.exit(4)
+
+        self.x = x_col.to_numpy(dtype=np.float64)
+        self.y = y_col.to_numpy(dtype=np.float64)
+        self.situation = __raw_data[__situation_col][mask].tolist()
         print(f"успешно, найдено {len(self.x)} точки, длина профиля {self.x[-1]:.2f} м")
 
-        self.ele_min = min(self.y)  # Минимальная отметка профиля
-        self.ele_max = max(self.y)  # Максимальная отметка профиля
+        self.ele_min = float(self.y.min())  # Минимальная отметка профиля
+        self.ele_max = float(self.y.max())  # Максимальная отметка профиля
 
         # Заполнения таблицы обеспеченностей
         print('    — Считываем обеспеченности ... ', end='')
-        for i in range(6, len(__raw_data[0])):
-            self.probability.append([__raw_data[0][i], __raw_data[1][i]])
+        # Обеспеченности в первой строке, расходы во второй, начиная с седьмого столбца
+        probability = __raw_data.iloc[0, 6:].to_numpy()
+        consumption = __raw_data.iloc[1, 6:].to_numpy()
 
-        # Удаляем пустые обеспеченности из списка обеспеченностей
-        self.probability = [x for x in self.probability if x != ['', '']]
+        # Пропускаем пустые обеспеченности (пустые обе ячейки)
+        mask = (probability != '') | (consumption != '')
+        self.probability = [list(pair) for pair in zip(probability[mask].tolist(), consumption[mask].tolist())]
 
         print(f"успешно, найдено {len(self.probability)} обеспеченностей.")
 
         # Обработка и получение данных по секторам из "сырых" данных
         self.sectors = get_sectors(self)
 
+        self._save_cache(cache_path)
+
     def get_min_sector(self):
         """
         Функция нахождения участка с наименьшей отметкой дна.
 
         :return: [Номер по списку, [Участок]]
         """
+        # Минимальные отметки участков определяются при чтении участков
+        id = int(np.argmin(self._sector_array['y_min']))
+        return (id, self.sectors[id])
 
-        id = 0
-        i = 0
-        min_sector = self.sectors[0]
+    def get_overflow_levels(self):
+        """
+        Функция определения уровней воды, начиная с которых вода переливается в участки
+        из участка с наименьшей отметкой дна (расчёт с переливом через бровку).
+        Вода переливается в соседний участок, когда уровень достигает максимальной отметки
+        половины заполненного участка со стороны соседа.
 
-        for sector in self.sectors:
-            if min(sector.coord[1]) < min(min_sector.coord[1]):
-                min_sector = sector
-                id = i
-            i += 1
-        return (id, min_sector)
+        :return: Массив уровней перелива по участкам (-inf для участка с наименьшей отметкой,
+                 inf для участков, в которые вода не переливается)
+        """
+        # Через половину участка без точек вода не переливается
+        left_max = np.nan_to_num(self._sector_array['y_max_left'], nan=math.inf)
+        right_max = np.nan_to_num(self._sector_array['y_max_right'], nan=math.inf)
+
+        min_index = self.get_min_sector()[0]
+        levels = np.empty(len(self.sectors))
+        levels[min_index] = -math.inf
+
+        # Перелив влево и вправо от участка с наименьшей отметкой: накопленный максимум
+        # отметок бровок между участком и участком с наименьшей отметкой
+        levels[:min_index] = np.maximum.accumulate(left_max[min_index:0:-1])[::-1]
+        levels[min_index + 1:] = np.maximum.accumulate(right_max[min_index:-1])
+        return levels
 
     def get_q_max(self):
         """
@@ -598,14 +1089,11 @@ class Morfostvor(object):
 
         :return: [Обеспеченность, Расход]
         """
-        q_max = float(self.probability[0][1])
-        obsp = self.probability[0][0]
-        for Q in self.probability:
-            if q_max <= Q[1]:
-                q_max = Q[1]
-                obsp = Q[0]
+        consumption = np.array([prob[1] for prob in self.probability], dtype=np.float64)
+        # При равных расходах берётся последняя обеспеченность
+        id = len(consumption) - 1 - int(np.argmax(consumption[::-1]))
 
-        return (obsp, q_max)
+        return (self.probability[id][0], float(consumption[id]))
 
     def doc_export(self, out_filename, r=False):
         print('\n\nФормируем doc файл: ')
@@ -617,13 +1105,13 @@ class Morfostvor(object):
         temp_dir.mkdir(parents=True, exist_ok=True)
 
         # Создаем папку для сохранения отдельных изображений
-        if config.PROFILE_SAVE_PICTURES:
+        if config.PROFILE_SAVE_PICTURES or config.CURVE_SAVE_PICTURES:
             picture_dir = Path(
                 str(Path(out_filename).parents[0]) + '/' + config.GRAPHICS_DIR_NAME)
             picture_dir.mkdir(parents=True, exist_ok=True)
 
         if r:
-            doc = DocxTemplate(template_file)
+            doc = _open_template(template_file)
         else:
             if os.path.isfile(doc_file):
                 doc = Document(doc_file)
@@ -635,7 +1123,7 @@ class Morfostvor(object):
                     print('    — Включена перезапись файла, удаляем старый и создаём новый.')
                 else:
                     print('    — Файл не найден! Создаём новый.')
-                doc = DocxTemplate(template_file)
+                doc = _open_template(template_file)
 
         if config.HYDRAULIC_CURVE:
             self.fig_QH = GraphQH(self)
@@ -644,46 +1132,48 @@ class Morfostvor(object):
         if config.AREA_CURVE:
             self.fig_QF = GraphQF(self)
 
-        self.fig_profile = GraphProfile(self)
+        # Вставляем заголовок профиля
+        doc.add_paragraph(self.title, style='З-приложение-подзаголовок')
 
-        # Отрисовка смоченного периметра
-        if config.PROFILE_WET_PERIMITER:
-            self.fig_profile.draw_wet_perimeter()
+        # График профиля
+        if config.PROFILE_GRAPH:
+            self.fig_profile = GraphProfile(self)
 
-        # Отрисовка верхней границы сооружения
-        if self.top_limit:
-            self.fig_profile.draw_top_limit(
-                self.top_limit, text=self.top_limit_description)
+            # Отрисовка смоченного периметра
+            if config.PROFILE_WET_PERIMITER:
+                self.fig_profile.draw_wet_perimeter()
 
-        # Отрисовка границы предельного размыва профиля
-        if self.erosion_limit:
-            self.fig_profile.draw_erosion_limit(self.erosion_limit)
+            # Отрисовка верхней границы сооружения
+            if self.top_limit:
+                self.fig_profile.draw_top_limit(
+                    self.top_limit, text=self.top_limit_description)
 
-        # Отрисовка уровней воды на графике профиля
-        self.fig_profile.draw_levels_on_profile(self.levels_result)
+            # Отрисовка границы предельного размыва профиля
+            if self.erosion_limit:
+                self.fig_profile.draw_erosion_limit(self.erosion_limit)
 
-        self.fig_profile._update_limit()
-        if self.waterline and type(self.waterline) != str:
-            self.fig_profile.draw_waterline(
-                round(self.waterline, 2), color='blue', linestyle='-')
+            # Отрисовка уровней воды на графике профиля
+            self.fig_profile.draw_levels_on_profile(self.levels_result)
 
-        print('    — Сохраняем график профиля ... ', end='')
-        self.fig_profile.fig.savefig(Path(f"{config.TEMP_DIR_NAME}/Profile.png", dpi=config.FIG_DPI))
-        print('успешно!')
+            self.fig_profile._update_limit()
+            if self.waterline and type(self.waterline) != str:
+                self.fig_profile.draw_waterline(
+                    round(self.waterline, 2), color='blue', linestyle='-')
 
-        # Вставляем заголовок профиля
-        doc.add_paragraph(self.title, style='З-приложение-подзаголовок')
+            print('    — Сохраняем график профиля ... ', end='')
+            self.fig_profile.fig.savefig(Path(f"{config.TEMP_DIR_NAME}/Profile.png", dpi=config.FIG_DPI))
+            print('успешно!')
 
-        # Добавляем изображения профиля и гидравлической кривой
-        print('    — Вставляем графику (профиль и кривую)... ', end='')
-        doc.add_picture(f"{config.TEMP_DIR_NAME}/Profile.png", width=Cm(16.5))
-        setLastParagraphStyle('Р-рисунок', doc)
+            # Добавляем изображения профиля и гидравлической кривой
+            print('    — Вставляем графику (профиль и кривую)... ', end='')
+            doc.add_picture(f"{config.TEMP_DIR_NAME}/Profile.png", width=Cm(16.5))
+            setLastParagraphStyle('Р-рисунок', doc)
 
-        # Подпись рисунков
-        if config.GRAPHICS_TITLES_TEXT:
-            doc.add_paragraph('Рисунок — ' + self.fig_profile.morfostvor.title, style='Р-название')
+            # Подпись рисунков
+            if config.GRAPHICS_TITLES_TEXT:
+                doc.add_paragraph('Рисунок — ' + self.fig_profile.morfostvor.title, style='Р-название')
 
-        print('успешно!')
+            print('успешно!')
 
         if config.HYDRAULIC_CURVE:
             print('    — Сохраняем график гидравлической кривой ... ', end='')
@@ -727,13 +1217,16 @@ class Morfostvor(object):
         # Проверяем имя файла
         profile_name = sanitize_filename(self.title)
 
-        # Сохраняем картинки в отдельные файлы в папку graphics
-        if config.PROFILE_SAVE_PICTURES:
+        # Сохраняем картинки построенных графиков в отдельные файлы в папку graphics
+        if config.PROFILE_SAVE_PICTURES and config.PROFILE_GRAPH:
             self.fig_profile.fig.savefig(Path(f"{picture_dir}/{profile_name}.png", dpi=config.FIG_DPI))
         if config.CURVE_SAVE_PICTURES:
-            self.fig_QH.fig.savefig(Path(f"{picture_dir}/{profile_name}_QH.png", dpi=config.FIG_DPI))
-            self.fig_QV.fig.savefig(Path(f"{picture_dir}/{profile_name}_QV.png", dpi=config.FIG_DPI))
-            self.fig_QF.fig.savefig(Path(f"{picture_dir}/{profile_name}_QF.png", dpi=config.FIG_DPI))
+            if config.HYDRAULIC_CURVE:
+                self.fig_QH.fig.savefig(Path(f"{picture_dir}/{profile_name}_QH.png", dpi=config.FIG_DPI))
+            if config.SPEED_CURVE:
+                self.fig_QV.fig.savefig(Path(f"{picture_dir}/{profile_name}_QV.png", dpi=config.FIG_DPI))
+            if config.AREA_CURVE:
+                self.fig_QF.fig.savefig(Path(f"{picture_dir}/{profile_name}_QF.png", dpi=config.FIG_DPI))
 
         # Вывод таблицы расчётных уровней воды
         print('    — Записываем таблицу уровней воды ... ', end='')
@@ -807,7 +1300,8 @@ class Morfostvor(object):
         print('успешно!')
 
         # Удаляем объект профиля
-        self.fig_profile.clean()
+        if config.PROFILE_GRAPH:
+            self.fig_profile.clean()
 
         try:
             doc.save(doc_file)
@@ -826,8 +1320,8 @@ class Morfostvor(object):
 
     def calculate(self):
         # Значение расхода до которого необходимо считать (максимальной введенная обеспеченности + 20%)
-        consumption_check = self.get_q_max()[1] + (
-            self.get_q_max()[1] * 0.20)
+        q_max = self.get_q_max()[1]
+        consumption_check = q_max + (q_max * 0.20)
 
         # Проверяем задан ли расчётный шаг в исходных данных
         if isinstance(self.dH, str) or self.dH == 0:
@@ -841,46 +1335,90 @@ class Morfostvor(object):
 
         min_sector = self.get_min_sector()
 
-        # Исходные сектора для расчёта (сектор, содержащий минимальную отметку)
+        # Исходные сектора для расчёта (сектор, содержащий минимальную отметку),
+        # множество повторяет список для быстрой проверки вхождения
         calc_sectors = [min_sector[0]]
+        calc_set = {min_sector[0]}
+
+        if config.OVERFLOW:
+            # Максимальные отметки левой и правой половин участков (проверка перелива)
+            left_max = self._sector_array['y_max_left']
+            right_max = self._sector_array['y_max_right']
+
+            # Отсортированные уровни перелива: проверка перелива через границы участков
+            # выполняется только при достижении следующего уровня перелива
+            overflow_levels = self.get_overflow_levels()
+            overflow_events = np.sort(overflow_levels[np.isfinite(overflow_levels)])
+            next_overflow = overflow_events[0] if overflow_events.size else math.inf
 
         # Уровень воды, с минимальным отступом
-        water_level = min(self.y) + dH
+        water_level = self.ele_min + dH
 
-        # Обнулённые переменные
+        # Суммарный расход на текущем уровне
         consumption_summ = 0
-        area_summ = 0
-        n = 0
 
         col = ['Участок', 'УВ', 'F', 'B', 'Hср', 'Hмакс', 'V', 'Q', 'Shezi']
-        df = pd.DataFrame(columns=col, dtype=float)
-        # Первый расчётный элемент суммирующей кривой со всеми нулями§
-        df = df.append(dict(zip(col, ['Сумма', self.ele_min,  0,  0,  0,  0,  0,  0,  0])), ignore_index=True)
+        # Строки результирующей таблицы накапливаются в списке, таблица создаётся один раз после расчёта
+        # Первый расчётный элемент суммирующей кривой со всеми нулями
+        # (строки — кортежи значений в порядке столбцов col)
+        rows = [('Сумма', self.ele_min,  0,  0,  0,  0,  0,  0,  0)]
+
+        # Границы и параметры участков для скомпилированного расчёта
+        sector_starts = np.ascontiguousarray(self._sector_array['start'])
+        sector_ends = np.ascontiguousarray(self._sector_array['end'])
+
+        if NUMBA_ENABLED and not config.OVERFLOW:
+            # Расчёт с заполнением по участкам скомпилированной функцией: уровни рассчитываются
+            # пакетами до достижения расчётного расхода, без возврата в python на каждом уровне
+            while consumption_summ < consumption_check:
+                levels, levels_result, consumption_summ = _sweep_levels(
+                    self.x, self.y, sector_starts, sector_ends, self._n, self._i,
+                    water_level, dH, consumption_check, SWEEP_BATCH, config.CALC_TYPE, GRAVITY)
+                print(f"Выполняем расчёты для уровня {levels[-1]:.2f}", end='\r')
+
+                # Результаты переводятся в списки python один раз на пакет уровней
+                for level, sectors_result in zip(levels.tolist(), levels_result.tolist()):
+                    level = round(level, 2)
+                    for sector, values in zip(self.sectors, sectors_result):
+                        # Участок без воды
+                        if math.isnan(values[0]):
+                            continue
+                        rows.append((sector.name, level, *values))
+
+                    # Пустые значения для суммирующей кривой
+                    rows.append(('Сумма', level,  0,  0,  0,  0,  0,  0,  0))
+
+                water_level = float(levels[-1]) + dH
 
         # Цикл расчёта до максимальной обеспеченности + 20% из исходных данных
+        level_num = 0
         while consumption_summ < consumption_check:
-            print(f"Выполняем расчёты для уровня {water_level:.2f}", end='\r')
+            # Вывод хода расчёта не на каждом уровне, вывод в консоль дороже расчёта уровня
+            if level_num % PROGRESS_STEP == 0:
+                print(f"Выполняем расчёты для уровня {water_level:.2f}", end='\r')
+            level_num += 1
 
             consumption_summ = 0
-            wc_list = list()
-            area_list = list()
 
             if config.OVERFLOW:
+                if water_level >= next_overflow:
+                    for i in calc_sectors:
+                        # Проверка на перелив через границы участка
+                        if (water_level >= left_max[i]) and (i - 1 not in calc_set) and (i - 1 >= 0):
+                            calc_sectors.append(i - 1)
+                            calc_set.add(i - 1)
+                        if (water_level >= right_max[i]) and (i + 1 not in calc_set) and (i + 1 <= len(self.sectors) - 1):
+                            calc_sectors.append(i + 1)
+                            calc_set.add(i + 1)
+
+                    # Следующий уровень перелива выше текущего уровня воды
+                    event = np.searchsorted(overflow_events, water_level, side='right')
+                    next_overflow = overflow_events[event] if event < overflow_events.size else math.inf
+
                 for i in calc_sectors:
                     sector = self.sectors[i]
-                    x = sector.coord[0]
-                    y = sector.coord[1]
-
-                    # Максимальная отметка слева
-                    previous_min_ele = max(chunk_list(y, 2)[0])
-                    # Максимальная отметка справа
-                    next_min_ele = max(chunk_list(y, 2)[1])
-
-                    # Проверка на перелив через границы участка
-                    if (water_level >= previous_min_ele) and (i - 1 not in calc_sectors) and (i - 1 >= 0):
-                        calc_sectors.append(i - 1)
-                    if (water_level >= next_min_ele) and (i + 1 not in calc_sectors) and (i + 1 <= len(self.sectors) - 1):
-                        calc_sectors.append(i + 1)
+                    x = sector.x
+                    y = sector.y
 
                     # Сектор воды и основные его параметры
                     # Расчетный участок является участком с минимальными отметками
@@ -903,30 +1441,29 @@ class Morfostvor(object):
                     # Расчёт параметров для воды
                     calc = Calculation(h=water.average_depth, n=sector.roughness, i=sector.slope, a=water.area)
 
-                    wc_list.append(calc.q)
+                    consumption_summ += calc.q
 
-                    r = dict(zip(col,
-                                 [sector.name,
-                                  round(water_level, 2),
-                                  water.area,
-                                  water.width,
-                                  water.average_depth,
-                                  water.max_depth,
-                                  calc.v,
-                                  calc.q,
-                                  calc.shezi]))
+                    r = (sector.name,
+                         round(water_level, 2),
+                         water.area,
+                         water.width,
+                         water.average_depth,
+                         water.max_depth,
+                         calc.v,
+                         calc.q,
+                         calc.shezi)
 
                     # Добавляем в список с результирующими значениями значения по секторам
                     # для последующего суммирования/вычисления средних значений
-                    df = df.append(r, ignore_index=True)
+                    rows.append(r)
 
             else:
                 # Расчёт с заполнением по участкам
                 for sector in self.sectors:
-                    x = sector.coord[0]
-                    y = sector.coord[1]
+                    x = sector.x
+                    y = sector.y
 
-                    if min(y) < water_level:
+                    if sector.y_min < water_level:
                         # Сектор воды и основные его параметры
                         water = WaterSection(x, y, water_level)
 
@@ -934,46 +1471,48 @@ class Morfostvor(object):
                         calc = Calculation(
                             h=water.average_depth, n=sector.roughness, i=sector.slope, a=water.area)
 
-                        wc_list.append(calc.q)
+                        consumption_summ += calc.q
 
                         # Добавляем в список с значения по секторам
-                        r = dict(zip(col, [sector.name,
-                                     round(water_level, 2),
-                                     water.area,
-                                     water.width,
-                                     water.average_depth,
-                                     water.max_depth,
-                                     calc.v,
-                                     calc.q,
-                                     calc.shezi]))
+                        r = (sector.name,
+                             round(water_level, 2),
+                             water.area,
+                             water.width,
+                             water.average_depth,
+                             water.max_depth,
+                             calc.v,
+                             calc.q,
+                             calc.shezi)
 
                         # Добавляем в список с результирующими значениями значения по секторам
                         # для последующего суммирования/вычисления средних значений
-                        df = df.append(r, ignore_index=True)
-
-            consumption_summ += sum(wc_list)
-            area_summ += sum(area_list)
+                        rows.append(r)
 
             # Пустые значения для суммирующей кривой
-            r_sum = dict(zip(col, ['Сумма', round(water_level, 2),  0,  0,  0,  0,  0,  0,  0]))
-            df = df.append(r_sum, ignore_index=True)
+            r_sum = ('Сумма', round(water_level, 2),  0,  0,  0,  0,  0,  0,  0)
+            rows.append(r_sum)
 
             water_level += dH
-            n += 1
 
 
-        # TODO: remake to use one dataframe
-        df = df.set_index(['УВ', 'Участок'])
+        df = pd.DataFrame(rows, columns=col).set_index(['УВ', 'Участок'])
         water_levels = df.index.levels[0]
 
-        # Заполняем суммирующие данные
-        df.loc[(water_levels, 'Сумма'), 'F'] = df.groupby(level=0)['F'].transform('sum')
-        df.loc[(water_levels, 'Сумма'), 'B'] = df.groupby(level=0)['B'].transform('sum')
-        df.loc[(water_levels, 'Сумма'), 'Hср'] = df.groupby(level=0)['F'].transform('sum') / df.groupby(level=0)['B'].transform('sum')
-        df.loc[(water_levels, 'Сумма'), 'Hмакс'] = df.groupby(level=0)['Hмакс'].transform('max')
-        df.loc[(water_levels, 'Сумма'), 'Q'] = df.groupby(level=0)['Q'].transform('sum')
-        df.loc[(water_levels, 'Сумма'), 'V'] = (df.groupby(level=0)['Q'].transform('sum') / df.groupby(level=0)['F'].transform('sum'))
-        df.loc[(water_levels, 'Сумма'), 'Shezi'] = df.groupby(level=0)['Shezi'].transform('sum') / (df.groupby(level=0)['Shezi'].transform('count') - 1)
+        # Заполняем суммирующие данные, все суммы по уровням за одну группировку
+        agg = df.groupby(level=0).agg(
+            {'F': 'sum', 'B': 'sum', 'Hмакс': 'max', 'Q': 'sum', 'Shezi': ['sum', 'count']})
+        f_sum, b_sum, q_sum = agg[('F', 'sum')], agg[('B', 'sum')], agg[('Q', 'sum')]
+        summary = pd.DataFrame({
+            'F': f_sum,
+            'B': b_sum,
+            'Hср': f_sum / b_sum,
+            'Hмакс': agg[('Hмакс', 'max')],
+            'Q': q_sum,
+            'V': q_sum / f_sum,
+            'Shezi': agg[('Shezi', 'sum')] / (agg[('Shezi', 'count')] - 1),
+        })
+        summary.index = pd.MultiIndex.from_product([summary.index, ['Сумма']], names=df.index.names)
+        df.loc[summary.index, summary.columns] = summary
         df = df.fillna(0)
 
         # Интерполируем значения гидравлической кривой
@@ -985,25 +1524,65 @@ class Morfostvor(object):
         return df
 
     def get_p_table(self, df: pd.DataFrame):
-        result = pd.DataFrame(
-            columns=['P', 'Q', 'H', 'F'])
-
-        for prob in self.probability:
-            fQ = interpolate.interp1d(df['Q'], df.index)
-            fV = interpolate.interp1d(df['Q'], df['V'])
-            fF = interpolate.interp1d(df['Q'], df['F'])
-            h = float(fQ(prob[1]))
-            v = float(fV(prob[1]))
-            f = float(fF(prob[1]))
-
-            result = result.append(
-                {'P': prob[0],
-                 'H': h,
-                 'Q': prob[1],
-                 'V': v,
-                 'F': f}, ignore_index=True)
+        """
+        Таблица расчётных уровней, скоростей и площадей для заданных обеспеченностей.
+        Уровень, скорость и площадь интерполируются по расходу линейно,
+        расход вне пределов кривой считается ошибкой исходных данных.
 
-        return result
+            :param df: Суммарная гидравлическая кривая (индекс — уровни воды)
+        """
+        probability = [prob[0] for prob in self.probability]
+        consumption = np.array([prob[1] for prob in self.probability], dtype=np.float64)
+
+        # Интерполяция по расходу, значения расхода упорядочиваем по возрастанию
+        q = df['Q'].to_numpy(dtype=np.float64)
+        order = np.argsort(q, kind='stable')
+        xp = q[order]
+        fp = np.vstack((df.index.to_numpy(dtype=np.float64),
+                        df['V'].to_numpy(dtype=np.float64),
+                        df['F'].to_numpy(dtype=np.float64)))[:, order]
+
+        # Расход за пределами рассчитанной кривой не экстраполируется
+        outside = (consumption < xp[0]) | (consumption > xp[-1])
+        if outside.any():
+            j = int(np.flatnonzero(outside)[0])
+            print(f"\n\nОшибка! Расход {consumption[j]} обеспеченностью {probability[j]} вне пределов "
+                  f"рассчитанной гидравлической кривой ({xp[0]:.3f} — {xp[-1]:.3f}). "
+                  "Программа будет завершена.")
+            sys.exit(1)
+
+        h, v, area = (np.interp(consumption, xp, curve) for curve in fp)
+
+        return pd.DataFrame({'P': probability, 'Q': consumption, 'H': h, 'F': area, 'V': v})
+
+
+@lru_cache(maxsize=4096)
+def _fmt(value, precision):
+    """
+    Строка числа с заданным количеством знаков после запятой.
+    Повторяющиеся значения (отметки, коэффициенты шероховатости) форматируются один раз.
+
+        :param value: Число
+        :param precision: Количество знаков после запятой
+    """
+    return f"{value:.{precision}f}"
+
+
+@lru_cache(maxsize=4096)
+def _text_path(text, fontsize, rotation=0):
+    """
+    Контур текста подписи (в пунктах), центрированный относительно начала координат.
+    Одинаковые подписи строятся один раз.
+
+        :param text: Текст подписи
+        :param fontsize: Размер шрифта, pt
+        :param rotation: Угол поворота, градусы
+    """
+    path = TextPath((0, 0), text, size=fontsize)
+    extents = path.get_extents()
+    transform = Affine2D().translate(
+        -(extents.x0 + extents.x1) / 2, -(extents.y0 + extents.y1) / 2).rotate_deg(rotation)
+    return transform.transform_path(path)
 
 
 @dataclass
@@ -1017,10 +1596,11 @@ class Graph(object):
     _ax_title_text = ''
 
     morfostvor: Morfostvor = Morfostvor
-    fig: plt.figure = plt.figure(_fig_num, figsize=_fig_size)
-    ax: plt.subplot = fig.add_subplot(111)
+    fig: plt.figure = field(init=False, default=None, repr=False)
+    ax: plt.subplot = field(init=False, default=None, repr=False)
 
     def __post_init__(self):
+        self.create_figure()
         self.clean()
         morfostvor = self.morfostvor
 
@@ -1033,6 +1613,22 @@ class Graph(object):
         self.draw()
         self.set_style()
 
+    def create_figure(self):
+        """Создание рисунка и осей графика. Рисунок создаётся только при построении
+        графика (а не при импорте модуля), рисунок с тем же номером используется повторно.
+        """
+        if plt.fignum_exists(self._fig_num):
+            self.fig = plt.figure(self._fig_num)
+            self.fig.clear()
+        else:
+            self.fig = plt.figure(self._fig_num, figsize=self._fig_size)
+        self.create_axes()
+
+    def create_axes(self):
+        """Создание осей графика на рисунке.
+        """
+        self.ax = self.fig.add_subplot(111)
+
     def draw(self):
         pass
 
@@ -1096,15 +1692,13 @@ class Graph(object):
     def clean(self):
         """Очистка осей графика и обнуление связанных переменных
         """
-        # Очищаем все оси
-        for ax in vars(self):
-            if ax.startswith('ax'):
-                command = "self." + ax + ".cla()"
-                exec(command)
+        # Очищаем все оси (атрибуты, названия которых начинаются с ax)
+        for name, ax in vars(self).items():
+            if name.startswith('ax') and hasattr(ax, 'cla'):
+                ax.cla()
 
         # Обнуляем границы y
         self._y_limits = []
-        self._y_limits = []
 
 
 @dataclass
@@ -1121,38 +1715,37 @@ class GraphCurve(Graph):
         """
         try:
             if config.HYDRAULIC_CURVE_LEVELS:
-                for index, row in morfostvor.levels_result.iterrows():
-                    x1, x2 = 0, row[x]
-                    y1, y2 = row[y], row[y]
+                levels = morfostvor.levels_result
+                # Обеспеченности записаны цифрами или строкой, определяется один раз для всех уровней
+                p_is_num = [isinstance(p, numbers.Real) for p in levels['P'].tolist()]
+
+                # Строки таблицы уровней кортежами значений (без создания Series на каждую строку)
+                for k, (p, x_value, y_value) in enumerate(levels[['P', x, y]].itertuples(index=False, name=None)):
+                    x1, x2 = 0, x_value
+                    y1, y2 = y_value, y_value
 
                     # Вывод значений округленных, проверка на содержание значений
-                    try:
+                    if p_is_num[k]:
                         water_level_text = ax.text(
                             0.002,
-                            row[y],
-                            f"▼$P_{{{row['P']:.2g}\\%}} = {row[y]:.2f}$",
+                            y_value,
+                            f"▼$P_{{{p:.2g}\\%}} = {y_value:.2f}$",
                             color=config.COLOR['water_level_text'],
                             fontsize=config.FONT_SIZE['water_level'],
                             weight='bold')
 
-                        water_level_text.set_path_effects([
-                            path_effects.Stroke(
-                                linewidth=3,
-                                foreground='white',
-                                alpha=0.55),
-                            path_effects.Normal()])
+                        water_level_text.set_path_effects(_TEXT_STROKE)
 
-                    except ValueError:
+                    else:
                         water_level_text = ax.text(
                             0.002,
-                            row[y],
-                            f"▼${row['P']} = {row[y]:.2f}$",
+                            y_value,
+                            f"▼${p} = {y_value:.2f}$",
                             color=config.COLOR['water_level_text'],
                             fontsize=config.FONT_SIZE['water_level'],
                             weight='bold')
 
-                        water_level_text.set_path_effects([path_effects.Stroke(
-                            linewidth=3, foreground='white', alpha=0.55), path_effects.Normal()])
+                        water_level_text.set_path_effects(_TEXT_STROKE)
 
                     ax.plot([x1, x2, x2, x2], [y1, y2, y_min, y_min], linestyle='-',
                             color='mediumturquoise', marker='o', linewidth=1, markersize=1)
@@ -1213,8 +1806,6 @@ class GraphQV(GraphCurve):
     # Номер рисунка
     _fig_num = 3
     _fig_size = (16.5, 11)
-    fig: plt.figure = plt.figure(_fig_num, figsize=_fig_size)
-    ax: plt.subplot = fig.add_subplot(111)
 
     # Подписи осей
     _x_label_text = 'Q, м³/с'
@@ -1231,8 +1822,6 @@ class GraphQF(GraphCurve):
     # Номер рисунка
     _fig_num = 4
     _fig_size = (16.5, 11)
-    fig: plt.figure = plt.figure(_fig_num, figsize=_fig_size)
-    ax: plt.subplot = fig.add_subplot(111)
 
     # Подписи осей
     _x_label_text = 'Q, м³/с'
@@ -1249,19 +1838,26 @@ class GraphProfile(Graph):
     _fig_size = (16.5, 12)
     _fig_num = 1
 
-    fig: plt.figure = plt.figure(_fig_num, figsize=_fig_size)
-
-    __gs = gridspec.GridSpec(80, 3)
-
-    ax_top: plt.subplot = fig.add_subplot(__gs[0, :], frame_on=False)
-    ax: plt.subplot = fig.add_subplot(__gs[1:62, :])
-    ax_bottom: plt.subplot = fig.add_subplot(__gs[62:, :])
-    ax_bottom_overlay: plt.subplot = fig.add_subplot(
-        __gs[62:, :], frame_on=False)
+    ax_top: plt.subplot = field(init=False, default=None, repr=False)
+    ax_bottom: plt.subplot = field(init=False, default=None, repr=False)
+    ax_bottom_overlay: plt.subplot = field(init=False, default=None, repr=False)
 
     def __post_init__(self):
+        self.create_figure()
         self.clean()
 
+        # Участки по названиям и границы профиля (для линий размыва и ограничения)
+        self._sector_by_name = {sector.name: sector for sector in self.morfostvor.sectors}
+        self._x_min = min(self.morfostvor.x)
+        self._x_max = max(self.morfostvor.x)
+
+        # Границы оси y и соответствующий им шаг засечек
+        self._y_step_cache = None
+
+        # Вертикальные линии от точек профиля до подвала и их нижняя граница
+        self._point_lines = None
+        self._point_lines_bottom = None
+
         # Настройка параметров графиков и их инициализация
         self.fig.subplots_adjust(bottom=0.08, left=0.08, right=0.9)
 
@@ -1276,6 +1872,16 @@ class GraphProfile(Graph):
         self.draw_sectors()
         self.draw_profile_bottom()
 
+    def create_axes(self):
+        """Создание осей профиля: верхняя полоса участков, профиль и подвал.
+        """
+        gs = gridspec.GridSpec(80, 3)
+
+        self.ax_top = self.fig.add_subplot(gs[0, :], frame_on=False)
+        self.ax = self.fig.add_subplot(gs[1:62, :])
+        self.ax_bottom = self.fig.add_subplot(gs[62:, :])
+        self.ax_bottom_overlay = self.fig.add_subplot(gs[62:, :], frame_on=False)
+
     def draw_profile_bottom(self):
         """
         Отрисовка дна профиля.
@@ -1304,84 +1910,42 @@ class GraphProfile(Graph):
 
             self.ax_bottom.xaxis.set_label_coords(1.02, 0.92)
 
+        # Координаты точек профиля, первая и последняя координаты и количество точек
+        x = np.asarray(self.morfostvor.x)
+        y = np.asarray(self.morfostvor.y)
+        x_first, x_last, n = x[0], x[-1], x.size
+
         # Горизонтальные разделители подвала (полная рамка)
-        self.ax_bottom_overlay.plot(
-            (self.morfostvor.x[0], self.morfostvor.x[-1]), (0, 0),
-            color=config.COLOR['border'],
-            linewidth=config.LINE_WIDTH['profile_bottom'],
-            linestyle='solid')
-
-        self.ax_bottom_overlay.plot(
-            (self.morfostvor.x[0], self.morfostvor.x[-1]), (5, 5),
-            color=config.COLOR['border'],
-            linewidth=config.LINE_WIDTH['profile_bottom'],
-            linestyle='solid')
-
-        self.ax_bottom_overlay.plot(
-            (self.morfostvor.x[0], self.morfostvor.x[-1]), (10, 10),
-            color=config.COLOR['border'],
-            linewidth=config.LINE_WIDTH['profile_bottom'],
-            linestyle='solid')
-
-        self.ax_bottom_overlay.plot(
-            (self.morfostvor.x[0], self.morfostvor.x[-1]), (15, 15),
-            color=config.COLOR['border'],
-            linewidth=config.LINE_WIDTH['profile_bottom'],
-            linestyle='solid')
-
-        self.ax_bottom_overlay.plot(
-            (self.morfostvor.x[0], self.morfostvor.x[-1]), (20, 20),
-            alpha=0)
+        h_segments = [((x_first, h), (x_last, h)) for h in (0, 5, 10, 15)]
+
+        self.ax_bottom_overlay.plot((x_first, x_last), (20, 20), alpha=0)
 
         # Технический разделитель (для увеличения размера границ)
-        self.ax_bottom.plot(
-            (self.morfostvor.x[0], self.morfostvor.x[0]), (30, 40),
-            alpha=0)
-
-        # Цикл по всем точкам
-        for i in range(len(self.morfostvor.x)):
-            x = self.morfostvor.x[i]
-            y = self.morfostvor.y[i]
-
-            # Разделители расстояний между точками
-            self.ax_bottom.plot(
-                (x, x), (10, 20),
-                color=config.COLOR['border'],
-                linewidth=config.LINE_WIDTH['profile_bottom'],
-                linestyle='solid')
-
-            # Подписи отметок
-            self.ax_bottom.text(
-                x, 25, f"{y:.2f}",
-                color=config.COLOR['bottom_text'],
-                fontsize=config.FONT_SIZE['bottom_small'],
-                verticalalignment='center',
-                horizontalalignment='center',
-                rotation='90')
-
-        # Цикл по точкам до предпоследней
-        for i in range(len(self.morfostvor.x) - 1):
-            x = self.morfostvor.x[i]
-            x1 = self.morfostvor.x[i + 1]
-            y = self.morfostvor.y[i]
-
-            # Подписи расстояний между точками
-            self.ax_bottom.text(
-                (x + x1) / 2, 15, f"{round(x1 - x):d}",
-                color=config.COLOR['bottom_text'],
-                fontsize=config.FONT_SIZE['bottom_main'],
-                verticalalignment='center',
-                horizontalalignment='center')
+        self.ax_bottom.plot((x_first, x_first), (30, 40), alpha=0)
+
+        # Разделители расстояний между точками
+        v_segments = [((point, 10), (point, 20)) for point in x.tolist()]
+
+        # Подписи отметок
+        self.draw_text_collection(
+            self.ax_bottom, x, np.full(n, 25), [_fmt(h, 2) for h in y.tolist()],
+            fontsize=config.FONT_SIZE['bottom_small'], rotation=90)
+
+        # Подписи расстояний между точками
+        self.draw_text_collection(
+            self.ax_bottom, (x[:-1] + x[1:]) / 2, np.full(n - 1, 15),
+            list(map('{:d}'.format, np.rint(np.diff(x)).astype(int).tolist())),
+            fontsize=config.FONT_SIZE['bottom_main'])
 
         # Цикл по участкам
         for sector in self.morfostvor.sectors:
-            x = self.morfostvor.x[sector.start_point]
-            x1 = self.morfostvor.x[sector.end_point]
+            x0 = x[sector.start_point]
+            x1 = x[sector.end_point]
 
             # Подписи коэффициентов шероховатости по участкам
             try:
                 self.ax_bottom.text(
-                    (x + x1) / 2, 5, f"{sector.roughness:.3f}",
+                    (x0 + x1) / 2, 5, _fmt(sector.roughness, 3),
                     color=config.COLOR['bottom_text'],
                     fontsize=config.FONT_SIZE['bottom_main'],
                     verticalalignment='center',
@@ -1393,17 +1957,49 @@ class GraphProfile(Graph):
                 sys.exit(1)
 
             # Разделители коэффициентов шероховатости
-            self.ax_bottom.plot(
-                (x, x), (0, 10),
-                color=config.COLOR['border'],
-                linewidth=config.LINE_WIDTH['profile_bottom'],
-                linestyle='solid')
-
-            self.ax_bottom.plot(
-                (x1, x1), (0, 10),
-                color=config.COLOR['border'],
-                linewidth=config.LINE_WIDTH['profile_bottom'],
-                linestyle='solid')
+            v_segments.append(((x0, 0), (x0, 10)))
+            v_segments.append(((x1, 0), (x1, 10)))
+
+        # Все разделители подвала — по одной коллекции линий на оси
+        self.ax_bottom_overlay.add_collection(self._border_lines(h_segments))
+        self.ax_bottom.add_collection(self._border_lines(v_segments))
+
+    @staticmethod
+    def _border_lines(segments):
+        """
+        Коллекция линий разделителей подвала профиля.
+
+            :param segments: Список отрезков ((x1, y1), (x2, y2))
+        """
+        return LineCollection(
+            segments,
+            colors=config.COLOR['border'],
+            linewidths=config.LINE_WIDTH['profile_bottom'],
+            linestyles='solid',
+            capstyle=matplotlib.rcParams['lines.solid_capstyle'])
+
+    def draw_text_collection(self, ax, x, y, labels, fontsize, rotation=0, color=config.COLOR['bottom_text']):
+        """
+        Отрисовка набора подписей, выровненных по центру, одной коллекцией контуров.
+        Заменяет отдельный объект текста на каждую подпись (подписи в подвале профиля).
+
+            :param ax: Оси графика
+            :param x: Координаты x центров подписей
+            :param y: Координаты y центров подписей
+            :param labels: Тексты подписей
+            :param fontsize: Размер шрифта, pt
+            :param rotation: Угол поворота подписей, градусы
+            :param color: Цвет подписей
+        """
+        paths = [_text_path(label, fontsize, rotation) for label in labels]
+
+        # Контуры подписей заданы в пунктах, положения подписей — в координатах данных
+        collection = PathCollection(
+            paths, offsets=np.column_stack((x, y)), offset_transform=ax.transData,
+            transform=Affine2D().scale(1 / 72) + self.fig.dpi_scale_trans,
+            facecolors=color, edgecolors='none')
+        ax.add_collection(collection, autolim=False)
+        collection.set_clip_on(False)
 
     def draw_sectors(self):
         """
@@ -1415,21 +2011,17 @@ class GraphProfile(Graph):
         :return: Отрисовка графической информации по участкам профиля на графике ax_profile.
         """
 
-        h_max = np.floor(max(self.morfostvor.y)) + 1
-
-        for sector in self.morfostvor.sectors:
-            points = []
+        # Отрисовка информации по участкам отключена
+        if not (config.PROFILE_SECTOR_LABEL or config.PROFILE_SECTOR_FILL or config.PROFILE_SECTOR_BOTTOM_LINE):
+            return
 
-            for i in range(len(sector.coord[0])):
-                points.append((sector.coord[0][i], sector.coord[1][i]))
-
-            points.insert(0, (sector.coord[0][0], h_max))
-            points.append((sector.coord[0][-1], h_max))
+        h_max = np.floor(max(self.morfostvor.y)) + 1
 
-            polygon = matplotlib.patches.Polygon(
-                points, alpha=0.04, linestyle='--', label=sector.name)
-            polygon.set_color(sector.color)
+        # Полигоны участков и линии разделителей участков добавляются на график коллекциями
+        polygons = []
+        sector_segments = []
 
+        for sector in self.morfostvor.sectors:
             # Подписи названий и длин участков со стрелками
             if config.PROFILE_SECTOR_LABEL:
                 p0 = 1
@@ -1437,8 +2029,7 @@ class GraphProfile(Graph):
                 p3 = 3
 
                 # Расчёт середины участка (для центровки текста)
-                cent_x = sector.coord[0][-1] - \
-                    ((sector.coord[0][-1] - sector.coord[0][0]) / 2)
+                cent_x = sector.x[-1] - ((sector.x[-1] - sector.x[0]) / 2)
 
                 # Вывод ширины участка
                 self.ax_top.text(
@@ -1449,40 +2040,41 @@ class GraphProfile(Graph):
                 self.ax_top.text(cent_x, 6, sector.name, color=config.COLOR['sector_text'],
                                  verticalalignment='center', horizontalalignment='center',)
 
-                # Вывод разделителя участков профиля
-                self.ax_top.plot(
-                    [sector.coord[0][0], sector.coord[0][0]], [p0, p3],
-                    color=config.COLOR['sector_line'],
-                    linestyle='-',
-                    linewidth=config.LINE_WIDTH['sector_line'])  # Горизонтальная слева
-
-                self.ax_top.plot(
-                    [sector.coord[0][-1], sector.coord[0][-1]], [p0, p3],
-                    color=config.COLOR['sector_line'],
-                    linestyle='-',
-                    linewidth=config.LINE_WIDTH['sector_line'])  # Горизонтальная справа
-
-                self.ax_top.plot(
-                    [sector.coord[0][0], cent_x], [p1, p1],
-                    color=config.COLOR['sector_line'],
-                    linestyle='-',
-                    linewidth=config.LINE_WIDTH['sector_line'])  # Вертикальная слева
-
-                self.ax_top.plot(
-                    [cent_x, sector.coord[0][-1]], [p1, p1],
-                    color=config.COLOR['sector_line'],
-                    linestyle='-',
-                    linewidth=config.LINE_WIDTH['sector_line'])  # Вертикальная справа
+                # Разделители участков профиля
+                sector_segments += [
+                    ((sector.x[0], p0), (sector.x[0], p3)),  # Горизонтальная слева
+                    ((sector.x[-1], p0), (sector.x[-1], p3)),  # Горизонтальная справа
+                    ((sector.x[0], p1), (cent_x, p1)),  # Вертикальная слева
+                    ((cent_x, p1), (sector.x[-1], p1)),  # Вертикальная справа
+                ]
 
             # Заливка на профиле участков
             if config.PROFILE_SECTOR_FILL:
-                self.ax.add_patch(polygon)
+                # Точки участка, замкнутые сверху на отметке h_max
+                points = np.vstack((
+                    (sector.x[0], h_max),
+                    np.column_stack((sector.x, sector.y)),
+                    (sector.x[-1], h_max)))
+
+                polygon = matplotlib.patches.Polygon(
+                    points, alpha=0.04, linestyle='--', label=sector.name)
+                polygon.set_color(sector.color)
+                polygons.append(polygon)
 
             # Цвет линии дна по участкам
             if config.PROFILE_SECTOR_BOTTOM_LINE:
-                self.ax.plot(
-                    sector.coord[0], sector.coord[1],
-                    '-', color=sector.color)
+                self.ax.plot(sector.x, sector.y, '-', color=sector.color)
+
+        if sector_segments:
+            self.ax_top.add_collection(LineCollection(
+                sector_segments,
+                colors=config.COLOR['sector_line'],
+                linestyles='-',
+                linewidths=config.LINE_WIDTH['sector_line'],
+                capstyle=matplotlib.rcParams['lines.solid_capstyle']))
+
+        if polygons:
+            self.ax.add_collection(PatchCollection(polygons, match_original=True))
 
     def set_style(self):
         # Устанавливаем заголовки графиков
@@ -1584,15 +2176,43 @@ class GraphProfile(Graph):
     def draw_profile_point_lines(self):
         """
         Отрисовка вертикальных линий от точек до подвала.
+        Линии создаются один раз, при изменении нижней границы графика обновляются их отрезки.
 
         """
-        for i in range(len(self.morfostvor.x)):
-            self.ax.plot(
-                (self.morfostvor.x[i], self.morfostvor.x[i]),
-                (self.morfostvor.y[i], self._y_lim[0]),
-                color=config.COLOR['profile_point_line'],
-                linewidth=config.LINE_WIDTH['profile_point_line'],
-                linestyle='solid')
+        if self._point_lines is not None and self._point_lines in self.ax.collections:
+            if self._point_lines_bottom != self._y_lim[0]:
+                segments = np.empty((len(self.morfostvor.x), 2, 2))
+                segments[:, :, 0] = self.morfostvor.x[:, None]
+                segments[:, 0, 1] = self.morfostvor.y
+                segments[:, 1, 1] = self._y_lim[0]
+                self._point_lines.set_segments(segments)
+                self._point_lines_bottom = self._y_lim[0]
+            return
+
+        self._point_lines = self.ax.vlines(
+            self.morfostvor.x, self.morfostvor.y, self._y_lim[0],
+            color=config.COLOR['profile_point_line'],
+            linewidth=config.LINE_WIDTH['profile_point_line'],
+            linestyle='solid',
+            capstyle=matplotlib.rcParams['lines.solid_capstyle'],
+            zorder=2.1)  # Поверх линий и заливок урезов, добавляемых позже
+        self._point_lines_bottom = self._y_lim[0]
+
+    def _floodplain_bounds(self, x1=None, x2=None):
+        """
+        Границы горизонтальной линии на профиле: незаданные координаты берутся по границе
+        профиля, а при наличии участков 'Левая пойма', 'Правая пойма' — по этим участкам.
+
+            :param x1: Координата начала линии
+            :param x2: Координата конца линии
+        """
+        if x1 is None:
+            sector = self._sector_by_name.get('Левая пойма')
+            x1 = sector.x[-1] if sector is not None else self._x_min
+        if x2 is None:
+            sector = self._sector_by_name.get('Правая пойма')
+            x2 = sector.x[0] if sector is not None else self._x_max
+        return x1, x2
 
     def draw_erosion_limit(self, h, x1=None, x2=None, text='▼$H_{{разм.}} = {h:.2f}$'):
         """Функция отрисовки линии предельного размыва профиля.
@@ -1609,21 +2229,12 @@ class GraphProfile(Graph):
             # Ограничение линии предельного размыва
             # по всему профилю если параметр config.PROFILE_EROSION_LIMIT_FULL = true
             if config.PROFILE_EROSION_LIMIT_FULL:
-                x1 = min(self.morfostvor.x)
-                x2 = max(self.morfostvor.x)
+                x1 = self._x_min
+                x2 = self._x_max
             # Если координаты начала и конца линии не заданы, устанавливаем по границе профиля
             # если есть участки 'Левая пойма', 'Правая пойма' задаем границы линии по участкам
             else:
-                if x1 is None:
-                    x1 = min(self.morfostvor.x)
-                    for sector in self.morfostvor.sectors:
-                        if sector.name == 'Левая пойма':
-                            x1 = sector.coord[0][-1]
-                if x2 is None:
-                    x2 = max(self.morfostvor.x)
-                    for sector in self.morfostvor.sectors:
-                        if sector.name == 'Правая пойма':
-                            x2 = sector.coord[0][0]
+                x1, x2 = self._floodplain_bounds(x1, x2)
 
             # Подпись текста
             erosion_limit_text = self.ax.text(
@@ -1631,8 +2242,7 @@ class GraphProfile(Graph):
                 color=config.COLOR['erosion_limit_text'],
                 fontsize=config.FONT_SIZE['erosion_limit'], weight='bold')
             # Обводка текста
-            erosion_limit_text.set_path_effects([path_effects.Stroke(
-                linewidth=3, foreground='white', alpha=0.95), path_effects.Normal()])
+            erosion_limit_text.set_path_effects(_TEXT_STROKE_OPAQUE)
 
             # Отрисовка линии предельного размыва
             self.ax.plot([x1, x2], [h, h], color=config.COLOR['erosion_limit_line'],
@@ -1642,19 +2252,10 @@ class GraphProfile(Graph):
             self._update_limit()
 
     def draw_top_limit(self, h, x1=None, x2=None, text='{}\nH = {:.2f}'):
-        # y_step = self.ax.get_yticks()[1] - self.ax.get_yticks()[0]
+        # y_step = self._y_step()
         # Если координаты начала и конца линии не заданы, устанавливаем по границе профиля
         # если есть участки 'Левая пойма', 'Правая пойма' задаем границы линии по участкам
-        if x1 is None:
-            x1 = min(self.morfostvor.x)
-            for sector in self.morfostvor.sectors:
-                if sector.name == 'Левая пойма':
-                    x1 = sector.coord[0][-1]
-        if x2 is None:
-            x2 = max(self.morfostvor.x)
-            for sector in self.morfostvor.sectors:
-                if sector.name == 'Правая пойма':
-                    x2 = sector.coord[0][0]
+        x1, x2 = self._floodplain_bounds(x1, x2)
 
         # cent_x = x2 - ((x2 - x1) / 2)
 
@@ -1677,6 +2278,26 @@ class GraphProfile(Graph):
         self._y_limits.append(h)
         self._update_limit()
 
+    @staticmethod
+    def _add_water(water, segments, fills):
+        """
+        Добавление урезов и полигона водного сечения в списки для отрисовки.
+
+            :param water: Водное сечение (WaterSection)
+            :param segments: Список отрезков урезов ((x1, y1), (x2, y2))
+            :param fills: Список полигонов заливки воды
+        """
+        for boundary in water.boundary():
+            # Вводим служебные координаты
+            x1, x2 = boundary[0][0], boundary[0][1]  # Начало и конец x
+            y1, y2 = boundary[1][0], boundary[1][1]  # отметки уреза
+
+            # Урез воды
+            segments.append(((x1, y1), (x2, y2)))
+
+            if config.PROFILE_WATER_FILL:
+                fills.append(np.column_stack((water.water_section_x, water.water_section_y)))
+
     def draw_waterline(self, h, color=config.COLOR['water_line'], linestyle='--',
                        linewidth=config.LINE_WIDTH['water_line']):
         """
@@ -1686,33 +2307,27 @@ class GraphProfile(Graph):
         :return: урез на графике профиля (ax_profile).
         """
 
-        def draw_line(self):
-            for boundary in water.boundary():
-                # Вводим служебные координаты
-                x1, x2 = boundary[0][0], boundary[0][1]  # Начало и конец x
-                y1, y2 = boundary[1][0], boundary[1][1]  # отметки уреза
-
-                # Рисуем урез воды
-                self.ax.plot([x1, x2], [y1, y2], color=color,
-                             linestyle=linestyle, linewidth=linewidth)
-
-                if config.PROFILE_WATER_FILL:
-                    self.ax.fill(water.water_section_x, water.water_section_y,
-                                 facecolor=config.COLOR['water_fill'], alpha=0.2)
+        # Отрезки урезов и полигоны воды накапливаются и добавляются на график коллекциями
+        segments = []
+        fills = []
 
         if config.OVERFLOW:
-            water = WaterSection(self.morfostvor.x, self.morfostvor.y, h)
-            draw_line(self)
+            self._add_water(WaterSection(self.morfostvor.x, self.morfostvor.y, h), segments, fills)
 
         else:
-            # Рисуем урезы на каждом участке
+            # Урезы на каждом участке
             for sector in self.morfostvor.sectors:
-                x = sector.coord[0]
-                y = sector.coord[1]
-
-                if h >= min(y):
-                    water = WaterSection(x, y, h)
-                    draw_line(self)
+                if h >= sector.y_min:
+                    self._add_water(WaterSection(sector.x, sector.y, h), segments, fills)
+
+        # Рисуем урезы воды и заливку (окончания линий как у обычных линий графика)
+        capstyle = 'lines.solid_capstyle' if linestyle in ('-', 'solid') else 'lines.dash_capstyle'
+        self.ax.add_collection(LineCollection(
+            segments, colors=color, linestyles=linestyle, linewidths=linewidth,
+            capstyle=matplotlib.rcParams[capstyle]))
+        if fills:
+            self.ax.add_collection(PolyCollection(
+                fills, facecolors=config.COLOR['water_fill'], edgecolors='none', alpha=0.2))
 
         self._update_limit()
         self.set_style()
@@ -1726,67 +2341,74 @@ class GraphProfile(Graph):
         """
         label = []
 
-        for index, row in levels.iterrows():
-            # Отрисовка уреза
-            water_level = row['H']
+        # Параметры отображения линий сносок (одинаковы для всех уровней)
+        reference_style = {
+            'color': config.COLOR['water_reference_line'],
+            'linestyle': '--',
+            'linewidth': config.LINE_WIDTH['water_line'] / 1.75,
+            'alpha': 0.8,
+        }
 
-            self.draw_waterline(water_level)
+        # Границы графика по x для линий сносок
+        x_lim = None
 
-            if config.PROFILE_LEVELS_TITLE:
-                # Подпись уровня воды на профиле
-                water = WaterSection(
-                    self.morfostvor.x, self.morfostvor.y, water_level)
-                try:
-                    water = WaterSection(
-                        self.morfostvor.x, self.morfostvor.y, water_level)
-                except:
-                    print('Ошибка! При отрисовке расчётных уровней на профиле. \n')
+        # Координаты левого и правого урезов на профиле для всех уровней
+        left_x, right_x = water_endpoints(self.morfostvor.x, self.morfostvor.y, levels['H'].to_numpy(dtype=float))
+
+        # Обеспеченности записаны цифрами или строкой, определяется один раз для всех уровней
+        p_is_num = [isinstance(p, numbers.Real) for p in levels['P'].tolist()]
+
+        for k, (index, p, water_level) in enumerate(levels[['P', 'H']].itertuples(name=None)):
+            # Урез и подпись уровня за границами графика по вертикали не отрисовываются
+            # (подпись в примечании и линия сноски к таблице остаются)
+            visible = self.bottom_limit <= water_level <= self.top_limit
+
+            # Отрисовка уреза
+            if visible:
+                self.draw_waterline(water_level)
 
+            if config.PROFILE_LEVELS_TITLE and visible:
+                # Подпись уровня воды на профиле
                 padding = 0.01
-                x = water.water_section_x[0] + 2 * padding
+                x = left_x[k] + 2 * padding
                 y = water_level + padding
 
-                try:
+                if p_is_num[k]:
                     # Если обеспеченность записана цифрами
                     waterline_text = self.ax.text(
-                        x, y, f"▼$P_{{{row['P']:2g}\\%}} = {row['H']:.2f}$",
+                        x, y, f"▼$P_{{{p:2g}\\%}} = {water_level:.2f}$",
                         color=config.COLOR['water_level_text'],
                         fontsize=config.FONT_SIZE['water_level'],
                         weight='bold')
-                    waterline_text.set_path_effects([path_effects.Stroke(
-                        linewidth=3, foreground='white', alpha=0.55), path_effects.Normal()])
-                except ValueError:
+                    waterline_text.set_path_effects(_TEXT_STROKE)
+                else:
                     # Если обеспеченность записана строкой
                     waterline_text = self.ax.text(
                         x, y,
-                        f"{row['P']} = {row['H']:.2f}",
+                        f"{p} = {water_level:.2f}",
                         color=config.COLOR['water_level_text'],
                         fontsize=config.FONT_SIZE['water_level'],
                         weight='bold')
 
-                    waterline_text.set_path_effects([path_effects.Stroke(
-                        linewidth=1.8, foreground='white', alpha=0.55),
-                        path_effects.Normal()])
+                    waterline_text.set_path_effects(_TEXT_STROKE_THIN)
 
-            try:
-                label.append(f"$P_{{{row['P']:2g}\\%}} = {water_level:.2f}$ м\n")
-            except ValueError:
-                label.append(f"${row['P']} = {water_level:.2f}$ м\n")
+            if p_is_num[k]:
+                label.append(f"$P_{{{p:2g}\\%}} = {water_level:.2f}$ м\n")
+            else:
+                label.append(f"${p} = {water_level:.2f}$ м\n")
 
             # Вывод линий сносок от уровней воды к таблице
             if config.PROFILE_LEVELS_TABLE_LINES:
-                water = WaterSection(
-                    self.morfostvor.x, self.morfostvor.y, water_level)
-
                 # Горизонтальные точки линий сносок
-                x_step = (
-                    water.water_section_x[-1] - water.water_section_x[0]) / len(self.morfostvor.probability)
+                x_step = (right_x[k] - left_x[k]) / len(self.morfostvor.probability)
                 # Нижняя координата x
-                x0 = water.water_section_x[0] + (x_step * (index + 1) / 2)
+                x0 = left_x[k] + (x_step * (index + 1) / 2)
                 x1 = x0 + (x0 / 8 * (index + 1))  # Верхняя координата x
-                x_lim = self.ax.get_xlim()  # Получаем границы графика
+                # Границы графика фиксируются один раз, на первой линии сносок
+                if x_lim is None:
+                    x_lim = self.ax.get_xlim()  # Получаем границы графика
+                    self.ax.set_xlim(x_lim)  # Возвращаем границы на исходные
                 x3 = x_lim[1]  # Координата x границы справа
-                self.ax.set_xlim(x_lim)  # Возвращаем границы на исходные
 
                 # Вертикальные точки линий сносок
                 # 1% вертикальный от графика
@@ -1799,17 +2421,10 @@ class GraphProfile(Graph):
                     # Верхняя координата y для последующих линий уреза
                     y1 = self.top_limit - (y_step * 2.95 * (index))
 
-                # Устанавливаем параметры отображения линий сносок
-                color = config.COLOR['water_reference_line']
-                linestyle = '--'
-                linewidth = config.LINE_WIDTH['water_line'] / 1.75
-                alpha = 0.8
-
                 # Линии сносок
-                self.ax.plot([x0, x1], [y0, y1], color=color,
-                             linestyle=linestyle, linewidth=linewidth, alpha=alpha)
-                self.ax.plot([x1, x3], [y1, y1], color=color,
-                             linestyle=linestyle, linewidth=linewidth, alpha=alpha)
+                self.ax.plot([x0, x1], [y0, y1], **reference_style)
+                # Горизонтальная линия до правой границы графика (в долях ширины оси)
+                self.ax.axhline(y1, xmin=(x1 - x_lim[0]) / (x3 - x_lim[0]), xmax=1, **reference_style)
 
         if self.morfostvor.waterline and type(self.morfostvor.waterline) is not str:
             label.append(f"\nУВ = {self.morfostvor.waterline:.2f} м\n")
@@ -1845,92 +2460,105 @@ class GraphProfile(Graph):
 
         min_sector = self.morfostvor.get_min_sector()
 
-        # Исходные сектора для расчёта (сектор, содержащий минимальную отметку)
-        calc_sectors = [min_sector[0]]
-
-        # Уровень воды, с минимальным отступом
-        water_level = min(self.morfostvor.y) + dH
-
-        # Цикл расчёта до максимального уровня воды
-        while water_level < self.morfostvor.hydraulic_result['УВ'].max():
-            if config.OVERFLOW:
-                for i in calc_sectors:
-                    sector = self.morfostvor.sectors[i]
-                    x = sector.coord[0]
-                    y = sector.coord[1]
-
-                    # Максимальная отметка слева
-                    previous_min_ele = max(chunk_list(y, 2)[0])
-                    # Максимальная отметка справа
-                    next_min_ele = max(chunk_list(y, 2)[1])
+        # Уровни воды с шагом dH от минимальной отметки с отступом
+        # до максимального расчётного уровня гидравлической кривой
+        # (уровни накапливаются последовательным суммированием шага, как в расчёте кривой)
+        h_max = self.morfostvor.hydraulic_table.index.get_level_values('УВ').max()
+        steps = np.full(max(int(np.ceil((h_max - self.morfostvor.ele_min) / dH)) + 1, 1), dH)
+        steps[0] = self.morfostvor.ele_min + dH
+        levels = np.cumsum(steps)
+        levels = levels[levels < h_max]
 
-                    # Проверка на перелив через границы участка
-                    if (water_level >= previous_min_ele) and (i - 1 not in calc_sectors) and (i - 1 >= 0):
-                        calc_sectors.append(i - 1)
-                    if (water_level >= next_min_ele) and (i + 1 not in calc_sectors) and (i + 1 <= len(self.morfostvor.sectors) - 1):
-                        calc_sectors.append(i + 1)
+        # Точки смоченных периметров для всех уровней
+        sections = []
 
-                    # Сектор воды и основные его параметры
-                    # Расчетный участок является участком с минимальными отметками
-                    # либо расчёт выполняется с одновременным заполнением
-                    # начинаем заполнять с точки с минимальной отметкой
-                    if sector.id == min_sector[1].id:
-                        water = WaterSection(x, y, water_level)
-
-                    # Расчетный участок находится слева от начального
-                    # начинаем заполнять с крайней правой точки
-                    elif sector.id < min_sector[1].id:
-                        water = WaterSection(x, y, water_level, start_point=[
-                                             len(y) - 1, y[-1]])
-
-                    # Расчетный участок находится справа от начального
-                    # начинаем заполнять с крайней левой точки
-                    elif sector.id > min_sector[1].id:
-                        water = WaterSection(
-                            x, y, water_level, start_point=[0, y[0]])
-
-                    # Отрисовка смоченного периметра на профиле на профиле
-                    self.ax.plot(water.water_section_x, water.water_section_y,
-                                 ':', marker='o', linewidth=1, color='black', markersize=3)
-                    self.ax.plot([water.water_section_x[0], water.water_section_x[-1]], [
-                        water.water_section_y[0], water.water_section_y[-1]], ':', linewidth=1, color='black',)
-            else:
-                # Отрисовка с заполнением по участкам
-                for sector in self.morfostvor.sectors:
-                    x = sector.coord[0]
-                    y = sector.coord[1]
-
-                    if min(y) < water_level:
-                        # Сектор воды и основные его параметры
-                        water = WaterSection(x, y, water_level)
-
-                        # Отрисовка смоченного периметра на профиле
-                        self.ax.plot(water.water_section_x, water.water_section_y,
-                                     ':', marker='o', linewidth=1, color='black', markersize=3)
-                        self.ax.plot([water.water_section_x[0], water.water_section_x[-1]], [
-                            water.water_section_y[0], water.water_section_y[-1]], ':', linewidth=1, color='black',)
+        # Цикл по участкам, для каждого участка — все уровни, при которых участок заполнен
+        if config.OVERFLOW:
+            # Уровни перелива воды в участки из участка с минимальной отметкой
+            overflow_levels = self.morfostvor.get_overflow_levels()
+
+            for sector, overflow_level in zip(self.morfostvor.sectors, overflow_levels.tolist()):
+                x = sector.x
+                y = sector.y
+
+                # Сектор воды и основные его параметры
+                # Расчетный участок является участком с минимальными отметками
+                # либо расчёт выполняется с одновременным заполнением
+                # начинаем заполнять с точки с минимальной отметкой
+                if sector.id == min_sector[1].id:
+                    start_point = None
+
+                # Расчетный участок находится слева от начального
+                # начинаем заполнять с крайней правой точки
+                elif sector.id < min_sector[1].id:
+                    start_point = [len(y) - 1, y[-1]]
+
+                # Расчетный участок находится справа от начального
+                # начинаем заполнять с крайней левой точки
+                else:
+                    start_point = [0, y[0]]
 
-            water_level += dH
+                for water_level in levels[levels >= overflow_level].tolist():
+                    water = WaterSection(x, y, water_level, start_point=start_point)
+                    sections.append(np.column_stack((water.water_section_x, water.water_section_y)))
+        else:
+            # Отрисовка с заполнением по участкам
+            for sector in self.morfostvor.sectors:
+                # Смоченные периметры участка для всех уровней выше его дна
+                sector_levels = levels[levels > sector.y_min]
+                if not sector_levels.size:
+                    continue
+                points_x, points_y, offsets = _wet_perimeter_sweep(sector.x, sector.y, sector_levels)
+                sections.extend(np.split(np.column_stack((points_x, points_y)), offsets[1:-1]))
+
+        if not sections:
+            return
+
+        # Отрисовка смоченных периметров и линий урезов на профиле (по одной коллекции линий)
+        # и точек смоченных периметров одной линией маркеров
+        line_style = {
+            'colors': 'black',
+            'linestyles': ':',
+            'linewidths': 1,
+            'capstyle': matplotlib.rcParams['lines.dash_capstyle'],
+        }
+        self.ax.add_collection(LineCollection(sections, **line_style))
+        self.ax.add_collection(LineCollection([section[[0, -1]] for section in sections], **line_style))
+
+        points = np.concatenate(sections)
+        self.ax.plot(points[:, 0], points[:, 1], 'o', color='black', markersize=3)
+
+    def _y_step(self):
+        """
+        Шаг засечек по вертикали. Засечки вычисляются заново только при изменении границ оси y.
+        """
+        y_lim = self.ax.get_ylim()
+        if self._y_step_cache is None or self._y_step_cache[0] != y_lim:
+            ticks = self.ax.get_yticks()
+            self._y_step_cache = (y_lim, ticks[1] - ticks[0])
+        return self._y_step_cache[1]
 
     def _update_limit(self):
         # Шаг засечек по вертикали
-        y_step = self.ax.get_yticks()[1] - self.ax.get_yticks()[0]
+        y_step = self._y_step()
 
         # Минимальное и максимальное значения из списка границ
         min_y = min(self._y_limits)
         max_y = max(self._y_limits)
 
         # Нижняя граница
-        self.bottom_limit = np.ceil(min_y) - y_step
         if self.morfostvor.erosion_limit:
             self.bottom_limit = np.ceil(self.morfostvor.erosion_limit) - y_step
-            while (self.morfostvor.erosion_limit - self.bottom_limit) < (y_step/3):
-                self.bottom_limit -= y_step
+            lowest = self.morfostvor.erosion_limit
         else:
             self.bottom_limit = np.ceil(min_y) - y_step
+            lowest = self.morfostvor.ele_min
 
-            while (self.morfostvor.ele_min - self.bottom_limit) < (y_step/3):
-                self.bottom_limit -= y_step
+        # Отступ от наименьшей отметки до нижней границы не меньше трети шага засечек,
+        # граница опускается сразу на нужное количество шагов
+        shortage = y_step / 3 - (lowest - self.bottom_limit)
+        if shortage > 0:
+            self.bottom_limit -= y_step * math.ceil(shortage / y_step)
 
         # Верхняя граница
         if (y_step > 0.5):
@@ -1944,6 +2572,33 @@ class GraphProfile(Graph):
         self.draw_profile_point_lines()
 
 
+def _open_template(template_file):
+    """
+    Документ отчёта из шаблона. Новые версии docxtpl открывают шаблон только
+    при первом заполнении, поэтому документ шаблона открывается явно.
+
+        :param template_file: Путь к шаблону отчёта (.docx файл)
+    """
+    doc = DocxTemplate(template_file)
+    if getattr(doc, 'docx', None) is None and hasattr(doc, 'init_docx'):
+        doc.init_docx()
+    return doc
+
+
+def _calculate_page(in_filename, page):
+    """
+    Чтение и гидравлический расчёт одного листа xls файла (для расчёта в отдельном процессе).
+
+        :param in_filename: Входные данные по створам (.xls или .xlsx файл)
+        :param page: Номер листа
+        :return: Рассчитанный морфоствор
+    """
+    stvor = Morfostvor()
+    stvor.read_xls(in_filename, page)
+    stvor.calculate()
+    return stvor
+
+
 def xls_calculate_hydraulic(in_filename, out_filename, page=None):
     """
     Выполнение гидравлических расчетов и создание отчета по результатам расчетов.
@@ -1966,26 +2621,47 @@ def xls_calculate_hydraulic(in_filename, out_filename, page=None):
         except:
             pass
 
-    page_quantity = get_xls_sheet_quantity(in_filename)
-    stvors = []
-
-    # Расчет для всех листов xls файла
-    if page is None:
-        for i in range(page_quantity):
-            stvors.append(Morfostvor())
-            stvors[i].read_xls(in_filename, i)
-            stvors[i].calculate()
-            stvors[i].doc_export(out_filename)
-
-        # Вставка сводных таблиц
-        insert_summary_QV_tables(stvors, out_filename)
-
-    # Расчет только одного листа xls файла
-    elif type(page) == int:
-        stvor = Morfostvor()
-        stvor.read_xls(in_filename, page)
-        stvor.calculate()
-        stvor.doc_export(out_filename)
-    else:
-        print('Номер листа должен быть int.')
-        sys.exit(0)
+    # Бэкенд построения рисунков, после расчёта восстанавливается бэкенд вызывающей программы
+    backend = plt.get_backend()
+    if config.GRAPHICS_BACKEND:
+        try:
+            plt.switch_backend(config.GRAPHICS_BACKEND)
+        except ImportError:
+            print(f'Бэкенд matplotlib {config.GRAPHICS_BACKEND} недоступен, используется {backend}.')
+
+    try:
+        page_quantity = get_xls_sheet_quantity(in_filename)
+        stvors = []
+
+        # Расчет для всех листов xls файла
+        if page is None:
+            if config.PROCESSES > 1 and page_quantity > 1:
+                # Листы рассчитываются параллельно в отдельных процессах,
+                # запись в отчёт выполняется по порядку листов
+                # (лист записывается, как только рассчитаны он и все предыдущие листы)
+                with ProcessPoolExecutor(max_workers=min(config.PROCESSES, page_quantity)) as executor:
+                    for stvor in executor.map(partial(_calculate_page, in_filename), range(page_quantity)):
+                        stvors.append(stvor)
+                        stvor.doc_export(out_filename)
+            else:
+                for i in range(page_quantity):
+                    stvors.append(Morfostvor())
+                    stvors[i].read_xls(in_filename, i)
+                    stvors[i].calculate()
+                    stvors[i].doc_export(out_filename)
+
+            # Вставка сводных таблиц
+            insert_summary_QV_tables(stvors, out_filename)
+
+        # Расчет только одного листа xls файла
+        elif type(page) == int:
+            stvor = Morfostvor()
+            stvor.read_xls(in_filename, page)
+            stvor.calculate()
+            stvor.doc_export(out_filename)
+        else:
+            print('Номер листа должен быть int.')
+            sys.exit(0)
+    finally:
+        if config.GRAPHICS_BACKEND:
+            plt.switch_backend(backend)
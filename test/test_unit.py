@@ -3,7 +3,10 @@ from pathlib import Path
 p = Path(__file__).parents[1].absolute()
 
 sys.path.append(str(p.absolute()))
-from hydraulic import lib
+import pytest
+import numpy as np
+import pandas as pd
+from hydraulic import lib, profile
 
 
 # Квадрат
@@ -19,3 +22,87 @@ def test_poly_area_2():
 # Трапеция
 def test_poly_area_3():
     assert lib.poly_area([0, 2.5, 7.5, 10], [0, 5, 5, 0]) == 37.5
+
+
+# Урез пересекает откосы V-образного русла, границы определяются линейной интерполяцией
+def test_water_section_boundary():
+    water = profile.WaterSection([0, 5, 10], [10, 0, 10], 4)
+    assert water.water_section_x[0] == 3
+    assert water.water_section_x[-1] == 7
+    assert water.width == 4
+    assert water.area == 8
+    assert round(water.wet_perimeter, 6) == round(2 * 20 ** 0.5, 6)
+
+
+# Названия участков сравниваются без учёта регистра и лишних пробелов
+def test_normalize_name():
+    assert profile.normalize_name('  Русло   Реки ') == 'русло реки'
+    assert profile.normalize_name('Пойма\tлевая') is profile.normalize_name('пойма левая')
+
+
+# Урезы для нескольких уровней совпадают с границами WaterSection
+def test_water_endpoints():
+    left, right = profile.water_endpoints([0, 5, 10], [10, 0, 10], [4, 8])
+    assert left.tolist() == [3, 1]
+    assert right.tolist() == [7, 9]
+
+
+# Скомпилированный расчёт уровней совпадает с расчётом через WaterSection и Calculation
+def test_sweep_levels_matches_water_section():
+    x = np.array([0, 4, 10, 12, 15, 20, 26, 30], dtype=np.float64)
+    y = np.array([6, 3, 2, 4, 1, 0.5, 3, 6], dtype=np.float64)
+    starts = np.array([0, 3])
+    ends = np.array([3, 7])
+    n = np.array([0.05, 0.03])
+    i = np.array([1.5, 2.0])
+
+    levels, result, total = profile._sweep_levels(
+        x, y, starts, ends, n, i, 1.0, 0.5, np.inf, 8, profile.config.CALC_TYPE, profile.GRAVITY)
+    assert levels.tolist() == [1.0 + 0.5 * k for k in range(8)]
+
+    for level, sectors_result in zip(levels, result):
+        for k in range(len(starts)):
+            sector_x = x[starts[k]:ends[k] + 1]
+            sector_y = y[starts[k]:ends[k] + 1]
+            if sector_y.min() >= level:
+                assert np.isnan(sectors_result[k]).all()
+                continue
+
+            water = profile.WaterSection(sector_x, sector_y, level)
+            calc = profile.Calculation(h=water.average_depth, n=n[k], i=i[k], a=water.area)
+            expected = [water.area, water.width, water.average_depth, water.max_depth, calc.v, calc.q, calc.shezi]
+            assert np.allclose(sectors_result[k], expected, rtol=1e-9)
+
+
+# Расчёт всех листов .xlsx файла: листы считаются и читаются через pandas
+def test_xls_calculate_hydraulic_xlsx(tmp_path, monkeypatch):
+    sheet = pd.read_excel(p / 'example' / 'example_profile.xls', header=None)
+    xlsx = tmp_path / 'profile.xlsx'
+    with pd.ExcelWriter(xlsx) as writer:
+        sheet.to_excel(writer, sheet_name='1', header=False, index=False)
+        sheet.to_excel(writer, sheet_name='2', header=False, index=False)
+
+    # Шаблон отчёта задан путём относительно корня проекта
+    monkeypatch.chdir(p)
+    monkeypatch.setattr(profile.config, 'USE_CACHE', False)
+
+    out = tmp_path / 'report.docx'
+    profile.xls_calculate_hydraulic(str(xlsx), str(out))
+    assert lib.get_xls_sheet_quantity(str(xlsx)) == 2
+    assert out.is_file()
+
+
+# Расчётные уровни интерполируются по кривой, расход вне кривой — ошибка
+def test_get_p_table():
+    stvor = profile.Morfostvor()
+    curve = pd.DataFrame({'Q': [0.0, 10.0, 30.0], 'V': [0.0, 1.0, 2.0], 'F': [0.0, 10.0, 15.0]},
+                         index=[100.0, 101.0, 102.0])
+
+    stvor.probability = [['1%', 20.0], ['10%', 5.0]]
+    table = stvor.get_p_table(curve)
+    assert np.allclose(table['H'], [101.5, 100.5])
+    assert np.allclose(table['V'], [1.5, 0.5])
+
+    stvor.probability = [['1%', 40.0]]
+    with pytest.raises(SystemExit):
+        stvor.get_p_table(curve)